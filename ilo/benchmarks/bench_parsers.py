@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Parser and encoder benchmarks for ilo_monitor.py
+
+Replays captured tool output and Redfish payloads from fixtures/ through the
+collector hot paths at realistic (1x) and fleet-stress (100x) scale:
+- lm-sensors JSON and text parsing
+- ipmitool sdr and sel elist parsing
+- dmidecode memory parsing
+- Redfish Thermal/Power/Memory/Storage walking for iLO 4 and iLO 5
+- InfluxDB line protocol and NDJSON encoding, and the Sample conversion
+  they share
+
+--memory additionally compares the memory retained per host by collector
+result dicts and by the compact Sample form (as kept by --delta trackers).
+
+Usage:
+  python3 benchmarks/bench_parsers.py
+  python3 benchmarks/bench_parsers.py --save results/baseline.json
+  python3 benchmarks/bench_parsers.py --compare results/baseline.json
+
+Timings depend on the machine, so no baseline is committed: record one with
+--save on the base revision, on the machine that runs --compare.
+  python3 benchmarks/bench_parsers.py --case format_for_telegraf --memory
+"""
+
+import json
+import sys
+import os
+import argparse
+import logging
+import platform
+import statistics
+import timeit
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from ilomon import iLOConfig, iLOMonitor, samples_from_metrics  # noqa: E402
+
+SCALES = [1, 100]
+
+def read_fixture(name: str) -> str:
+    """Read a fixture file as text"""
+    with open(os.path.join(FIXTURE_DIR, name), 'r') as f:
+        return f.read()
+
+def scale_blocks(text: str, scale: int, rename: Callable[[str, int], str]) -> str:
+    """Repeat blank-line separated blocks, renaming each copy"""
+    if scale == 1:
+        return text
+    blocks = text.strip('\n').split('\n\n')
+    return '\n\n'.join(rename(block, i) for i in range(scale) for block in blocks) + '\n'
+
+def scale_lines(text: str, scale: int, rename: Callable[[str, int], str]) -> str:
+    """Repeat every line, renaming each copy"""
+    if scale == 1:
+        return text
+    lines = [line for line in text.split('\n') if line]
+    return '\n'.join(rename(line, i) for i in range(scale) for line in lines) + '\n'
+
+def scale_redfish(tree: Dict[str, Any], scale: int) -> Dict[str, Any]:
+    """Multiply sensors, DIMMs and drives in a Redfish fixture tree"""
+    if scale == 1:
+        return tree
+    tree = json.loads(json.dumps(tree))
+    for uri, resource in list(tree.items()):
+        for list_key in ("Temperatures", "Fans", "PowerSupplies"):
+            if isinstance(resource.get(list_key), list):
+                resource[list_key] = [
+                    {key: f"{value} {i}" if key in ("Name", "FanName") else value for key, value in item.items()}
+                    for i in range(scale) for item in resource[list_key]
+                ]
+        for link_key in ("Members", "Drives"):
+            if isinstance(resource.get(link_key), list) and uri.rstrip('/').endswith(("Memory", "DE00A000")):
+                copies = []
+                for i in range(scale):
+                    for link in resource[link_key]:
+                        original = tree[link['@odata.id']]
+                        copy_uri = f"{link['@odata.id'].rstrip('/')}-{i}/"
+                        tree[copy_uri] = {key: f"{value} {i}" if key in ("Name", "DeviceLocator") else value
+                                          for key, value in original.items()}
+                        copies.append({"@odata.id": copy_uri})
+                resource[link_key] = copies
+    return tree
+
+def local_monitor(outputs: Dict[Tuple[str, ...], str]) -> iLOMonitor:
+    """Build a local-mode monitor whose commands return fixture output"""
+    monitor = iLOMonitor(iLOConfig(hostname="localhost", username="", password="", version="5",
+                                   local_mode=True, thermal_plan_interval=0))
+    monitor.available_tools = {tool: True for tool in monitor.available_tools}
+    monitor._run_command = lambda command, timeout=30: outputs.get(tuple(command))
+    return monitor
+
+def remote_monitor(tree: Dict[str, Any], version: str) -> iLOMonitor:
+    """Build a remote monitor whose requests are answered from a fixture tree.
+
+    Payloads are kept serialised so JSON decoding is part of the measurement,
+    as it is for ``response.json()`` in ``make_request()``.
+    """
+    monitor = iLOMonitor(iLOConfig(hostname=f"ilo{version}.bench", username="bench", password="bench",
+                                   version=version, discovery_interval=0))
+    payloads = {uri: json.dumps(resource) for uri, resource in tree.items()}
+    monitor.make_request = lambda uri: json.loads(payloads[uri]) if uri in payloads else None
+    return monitor
+
+def parse_sensors_text(monitor: iLOMonitor, text: str) -> Dict[str, Any]:
+    """Run the lm-sensors text fallback parser and return what it produced"""
+    metrics = {}
+    monitor._parse_sensors_text_output(text, metrics)
+    return metrics
+
+def build_cases(scale: int) -> List[Tuple[str, Callable[[], Any]]]:
+    """Build the benchmark cases for one scale factor"""
+    sensors_json = json.loads(read_fixture("sensors_j.json"))
+    if scale > 1:
+        sensors_json = {f"{chip}-{i}": data for i in range(scale) for chip, data in sensors_json.items()}
+    sensors_text = scale_blocks(read_fixture("sensors.txt"), scale,
+                                lambda block, i: block.replace('\n', f"_{i}\n", 1))
+    rename_sdr = lambda line, i: f"{line[:12]}{i:<5}{line[17:]}"
+    sdr_temperature = scale_lines(read_fixture("ipmitool_sdr_temperature.txt"), scale, rename_sdr)
+    sdr_fan = scale_lines(read_fixture("ipmitool_sdr_fan.txt"), scale, rename_sdr)
+    sel = scale_lines(read_fixture("ipmitool_sel_elist.txt"), scale, lambda line, i: line)
+    dmidecode = scale_blocks(read_fixture("dmidecode_memory.txt"), scale,
+                             lambda block, i: block.replace("\tLocator: ", f"\tLocator: {i} "))
+
+    monitor = local_monitor({
+        ('sensors', '-A', '-j'): json.dumps(sensors_json),
+        ('ipmitool', 'sdr', 'type', 'temperature'): sdr_temperature,
+        ('ipmitool', 'sdr', 'type', 'fan'): sdr_fan,
+        ('ipmitool', 'sel', 'elist'): sel,
+        ('dmidecode', '-t', 'memory'): dmidecode,
+    })
+
+    ilo5 = remote_monitor(scale_redfish(json.loads(read_fixture("redfish_ilo5.json")), scale), "5")
+    ilo4 = remote_monitor(scale_redfish(json.loads(read_fixture("redfish_ilo4.json")), scale), "4")
+
+    def redfish_walk(target: iLOMonitor) -> Callable[[], Dict[str, Any]]:
+        def walk():
+            metrics = {}
+            metrics.update(target.get_system_health())
+            metrics.update(target.get_thermal_metrics())
+            metrics.update(target.get_power_metrics())
+            metrics.update(target.get_memory_metrics())
+            metrics.update(target.get_storage_metrics())
+            return metrics
+        return walk
+
+    # Encoder input: a full iLO 5 host plus the local parsers' output
+    encoder_metrics = {"timestamp": 1700000000, "ilo_host": "ilo5.bench", "ilo_version": "5"}
+    encoder_metrics.update(redfish_walk(ilo5)())
+    encoder_metrics.update(monitor._get_sensors_data())
+    encoder_metrics.update(monitor._get_ipmi_thermal_data())
+    encoder_metrics.update(monitor._get_dmidecode_memory())
+
+    encoder_samples = samples_from_metrics(encoder_metrics)
+    
+    cases = [
+        ("sensors_json", monitor._get_sensors_data),
+        ("sensors_text", lambda: parse_sensors_text(monitor, sensors_text)),
+        ("ipmi_sdr", monitor._get_ipmi_thermal_data),
+        ("ipmi_sel", monitor._get_ipmi_memory_data),
+        ("dmidecode_memory", monitor._get_dmidecode_memory),
+        ("redfish_ilo5", redfish_walk(ilo5)),
+        ("redfish_ilo4", redfish_walk(ilo4)),
+        ("format_for_telegraf", lambda: ilo5.format_for_telegraf(encoder_metrics)),
+        ("format_ndjson", lambda: ilo5.format_ndjson(encoder_metrics, per_metric=True)),
+        ("samples_from_metrics", lambda: samples_from_metrics(encoder_metrics)),
+        ("encode_line_protocol", lambda: ilo5.encode_line_protocol(encoder_samples, 1700000000, "ilo5.bench", "5")),
+    ]
+    
+    # One --trends pass over the encoder input's temperature, fan and power series (needs NumPy)
+    from ilomon.trends import TrendDetector, np
+    if np is not None:
+        trends = TrendDetector(30)
+        trend_metrics = json.loads(json.dumps(encoder_metrics))
+        cases.append(("trend_update", lambda: trends.update([("ilo5.bench", trend_metrics)]) or trend_metrics))
+    return cases
+
+def retained_bytes(build: Callable[[], Any], copies: int) -> int:
+    """Memory still allocated after building and keeping `copies` results"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build() for _ in range(copies)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+def measure_memory(hosts: int) -> Dict[str, float]:
+    """Bytes per host retained as collector dicts and as samples.
+    
+    Every host gets its own decoded copy of the same payload, as it would from
+    its own iLO, so strings are not shared unless the representation interns them.
+    """
+    redfish = scale_redfish(json.loads(read_fixture("redfish_ilo5.json")), 1)
+    ilo5 = remote_monitor(redfish, "5")
+    metrics = {}
+    for method in (ilo5.get_system_health, ilo5.get_thermal_metrics, ilo5.get_power_metrics,
+                   ilo5.get_memory_metrics, ilo5.get_storage_metrics):
+        metrics.update(method())
+    payload = json.dumps(metrics)
+    return {
+        "dict_bytes_per_host": retained_bytes(lambda: json.loads(payload), hosts) / hosts,
+        "sample_bytes_per_host": retained_bytes(lambda: samples_from_metrics(json.loads(payload)), hosts) / hosts
+    }
+
+def count_output(result: Any) -> int:
+    """Count metrics (dict entries) or lines (encoder output) a case produced"""
+    if isinstance(result, str):
+        return len(result.split('\n')) if result else 0
+    return len(result)
+
+def run_benchmarks(repeat: int, selected: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Run every case at every scale and return timings in microseconds"""
+    results = {}
+    for scale in SCALES:
+        for name, func in build_cases(scale):
+            if selected and name not in selected:
+                continue
+            timer = timeit.Timer(func)
+            loops, _ = timer.autorange()
+            times = [t / loops * 1e6 for t in timer.repeat(repeat, loops)]
+            results[f"{name}@{scale}x"] = {
+                "best_us": round(min(times), 2),
+                "median_us": round(statistics.median(times), 2),
+                "loops": loops,
+                "output": count_output(func())
+            }
+    return results
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float) -> List[str]:
+    """Return the cases whose median time regressed beyond the threshold"""
+    regressions = []
+    for case, result in results.items():
+        previous = baseline.get(case)
+        if not previous:
+            continue
+        ratio = result["median_us"] / previous["median_us"]
+        result["baseline_ratio"] = round(ratio, 3)
+        if ratio > threshold:
+            regressions.append(case)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ilo_monitor parsers and encoders")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions per case")
+    parser.add_argument("--case", action="append", default=[], help="Only run the named case (repeatable)")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline results JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                       help="Median slowdown ratio that counts as a regression")
+    parser.add_argument("--memory", type=int, nargs="?", const=1000, metavar="HOSTS",
+                       help="Also measure retained memory per host for dicts vs samples (default 1000 hosts)")
+    args = parser.parse_args()
+
+    # Checked before the run so a missing baseline fails in seconds, not after every case
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, 'r') as f:
+                baseline = json.load(f)["results"]
+        except FileNotFoundError:
+            parser.error(f"baseline {args.compare} not found; record one first with --save {args.compare} "
+                         f"(on the base revision, on this machine)")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            parser.error(f"cannot read baseline {args.compare}: {e}")
+
+    logging.disable(logging.CRITICAL)
+    results = run_benchmarks(args.repeat, args.case)
+
+    regressions = []
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+
+    print(f"{'case':<28}{'median_us':>14}{'best_us':>14}{'output':>10}{'vs_base':>10}")
+    for case, result in results.items():
+        ratio = result.get("baseline_ratio")
+        flag = " REGRESSION" if case in regressions else ""
+        print(f"{case:<28}{result['median_us']:>14.1f}{result['best_us']:>14.1f}{result['output']:>10}"
+              f"{(f'{ratio:.2f}x' if ratio else '-'):>10}{flag}")
+
+    memory = None
+    if args.memory:
+        memory = measure_memory(args.memory)
+        print(f"\nretained per host ({args.memory} hosts): dicts {memory['dict_bytes_per_host']:.0f} B, "
+              f"samples {memory['sample_bytes_per_host']:.0f} B")
+    
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump({
+                "meta": {
+                    "timestamp": datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "node": platform.node()
+                },
+                "results": results,
+                "memory": memory
+            }, f, indent=2)
+
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Fleet load test for ilo_monitor.py against the Redfish simulator
+
+Starts redfish_simulator.py in a separate process, points the collector at
+every simulated iLO and runs full collection cycles through the same
+run_collection_cycle() used by main(). Reports fleet cycle time, per-host
+p50/p99 latency, collector CPU time and RSS. With --workers the fleet is
+collected by a CollectorPool; CPU and RSS then include the worker processes
+and per-host latency is not reported.
+
+Usage:
+  python3 benchmarks/load_test.py --hosts 1000 --cycles 3
+  python3 benchmarks/load_test.py --hosts 4000 --workers 8
+  python3 benchmarks/load_test.py --hosts 200 --latency-ms 50 --jitter-ms 25 \\
+      --error-rate 0.01 --hang-rate 0.001 --hang-seconds 35 --save results/load.json
+"""
+
+import json
+import sys
+import os
+import argparse
+import contextlib
+import logging
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Dict, List, Any
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from ilomon import CollectorPool, iLOMonitor, load_config, run_collection_cycle  # noqa: E402
+from redfish_simulator import add_simulator_arguments  # noqa: E402
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, int(round(pct / 100.0 * len(ordered))) - 1)]
+
+def current_rss_mb(pid: str = "self") -> float:
+    """Resident set size of a process in MB"""
+    with open(f'/proc/{pid}/statm', 'r') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+def process_cpu_seconds(pid: int) -> float:
+    """User plus system CPU time of a live process"""
+    with open(f'/proc/{pid}/stat', 'r') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+def start_simulator(args: argparse.Namespace, config_path: str) -> subprocess.Popen:
+    """Launch the simulator process and wait until it is serving"""
+    command = [sys.executable, os.path.join(BENCH_DIR, "redfish_simulator.py"), "--write-config", config_path]
+    for name, value in vars(args).items():
+        if name in ("hosts", "mode", "port", "ilo4_percent", "latency_ms", "jitter_ms", "error_rate",
+                    "hang_rate", "hang_seconds", "tls_delay_ms", "seed"):
+            command.extend([f"--{name.replace('_', '-')}", str(value)])
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    ready = process.stdout.readline()
+    if not ready.startswith("Simulating"):
+        process.kill()
+        raise RuntimeError("Redfish simulator failed to start")
+    return process
+
+def run_inprocess_cycles(monitors: List[iLOMonitor], args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Run cycles in this process, timing every host"""
+    # Time each host's collection without changing how the cycle drives it
+    host_times = []
+    for monitor in monitors:
+        collect = monitor.collect_all_metrics
+        def timed_collect(collect=collect):
+            start = time.perf_counter()
+            try:
+                return collect()
+            finally:
+                host_times.append(time.perf_counter() - start)
+        monitor.collect_all_metrics = timed_collect
+
+    cycles = []
+    for _ in range(args.cycles):
+        host_times.clear()
+        usage_start = resource.getrusage(resource.RUSAGE_SELF)
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            run_collection_cycle(monitors, args.output, {})
+        elapsed = time.perf_counter() - start
+        usage_end = resource.getrusage(resource.RUSAGE_SELF)
+        cycles.append({
+            "cycle_seconds": round(elapsed, 3),
+            "host_p50_ms": round(percentile(host_times, 50) * 1000, 1),
+            "host_p99_ms": round(percentile(host_times, 99) * 1000, 1),
+            "host_max_ms": round(max(host_times) * 1000, 1),
+            "cpu_seconds": round((usage_end.ru_utime - usage_start.ru_utime)
+                                 + (usage_end.ru_stime - usage_start.ru_stime), 3),
+            "rss_mb": round(current_rss_mb(), 1)
+        })
+    return cycles
+
+def run_pool_cycles(pool: CollectorPool, count: int) -> List[Dict[str, Any]]:
+    """Run cycles through a worker pool, summing CPU and RSS over the workers"""
+    pids = [process.pid for process in pool.processes.values()]
+    cycles = []
+    try:
+        for _ in range(count):
+            usage_start = resource.getrusage(resource.RUSAGE_SELF)
+            cpu_start = sum(process_cpu_seconds(pid) for pid in pids)
+            start = time.perf_counter()
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                pool.run_cycle()
+            elapsed = time.perf_counter() - start
+            usage_end = resource.getrusage(resource.RUSAGE_SELF)
+            cycles.append({
+                "cycle_seconds": round(elapsed, 3),
+                "cpu_seconds": round(sum(process_cpu_seconds(pid) for pid in pids) - cpu_start
+                                     + (usage_end.ru_utime - usage_start.ru_utime)
+                                     + (usage_end.ru_stime - usage_start.ru_stime), 3),
+                "rss_mb": round(current_rss_mb() + sum(current_rss_mb(pid) for pid in pids), 1)
+            })
+    finally:
+        pool.stop()
+    return cycles
+
+def run_load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the configured number of fleet cycles and summarise them"""
+    with tempfile.TemporaryDirectory() as workdir:
+        config_path = os.path.join(workdir, "ilo_config.json")
+        simulator = start_simulator(args, config_path)
+        try:
+            configs = load_config(config_path)
+            for config in configs:
+                config.timeout = args.timeout
+                config.cache_dir = os.path.join(workdir, "cache")
+            if args.workers > 1:
+                pool = CollectorPool(configs, args.workers, args.output)
+                cycles = run_pool_cycles(pool, args.cycles)
+            else:
+                cycles = run_inprocess_cycles([iLOMonitor(config) for config in configs], args)
+        finally:
+            simulator.terminate()
+            simulator.wait()
+
+    return {
+        "hosts": len(configs),
+        "workers": args.workers,
+        "cycles": cycles,
+        "median_cycle_seconds": statistics.median(cycle["cycle_seconds"] for cycle in cycles),
+        "max_rss_mb": max([round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)]
+                          + [cycle["rss_mb"] for cycle in cycles])
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test ilo_monitor.py against a simulated iLO fleet")
+    add_simulator_arguments(parser)
+    parser.add_argument("--cycles", type=int, default=3, help="Collection cycles to run")
+    parser.add_argument("--workers", type=int, default=1, help="Collector worker processes (1 = in-process)")
+    parser.add_argument("--timeout", type=int, default=30, help="Per-request timeout given to the collector")
+    parser.add_argument("--output", choices=["json", "telegraf", "ndjson", "ndjson-metric"], default="telegraf",
+                       help="Output format to encode (written to /dev/null)")
+    parser.add_argument("--save", help="Write the summary to this JSON file")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    summary = run_load_test(args)
+
+    print(f"{'cycle':<7}{'seconds':>10}{'p50_ms':>10}{'p99_ms':>10}{'max_ms':>10}{'cpu_s':>9}{'rss_mb':>9}")
+    for i, cycle in enumerate(summary["cycles"], 1):
+        latency = "".join(f"{cycle[key]:>10.1f}" if key in cycle else f"{'-':>10}"
+                          for key in ("host_p50_ms", "host_p99_ms", "host_max_ms"))
+        print(f"{i:<7}{cycle['cycle_seconds']:>10.2f}{latency}{cycle['cpu_seconds']:>9.2f}{cycle['rss_mb']:>9.1f}")
+    print(f"{summary['hosts']} hosts, {summary['workers']} worker(s), median cycle {summary['median_cycle_seconds']:.2f}s, "
+          f"peak RSS {summary['max_rss_mb']:.1f} MB")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Simulated iLO fleet for load-testing ilo_monitor.py
+
+Serves the iLO 4 (/rest/v1) and iLO 5 (/redfish/v1) trees captured in
+fixtures/ for many simulated hosts, either one HTTPS port per host or one
+port shared by loopback addresses 127.0.x.y (one address per host).
+Latency, jitter, error rate, TLS handshake cost and hung connections are
+configurable so collector behaviour can be measured without hardware.
+
+Usage:
+  python3 benchmarks/redfish_simulator.py --hosts 1000 --mode loopback --port 8443
+  python3 benchmarks/redfish_simulator.py --hosts 50 --mode ports --port 9000 \\
+      --latency-ms 40 --jitter-ms 20 --error-rate 0.01 --hang-rate 0.001
+"""
+
+import json
+import sys
+import os
+import argparse
+import random
+import signal
+import socket
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Any, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+@dataclass
+class SimulatorConfig:
+    """Behaviour of the simulated fleet"""
+    hosts: int = 10
+    mode: str = "loopback"  # "loopback" or "ports"
+    port: int = 8443
+    ilo4_percent: int = 30  # Share of hosts serving the iLO 4 tree
+    latency_ms: float = 0
+    jitter_ms: float = 0
+    error_rate: float = 0
+    hang_rate: float = 0
+    hang_seconds: float = 300
+    tls: bool = True
+    tls_delay_ms: float = 0  # Extra cost per TLS handshake
+    seed: int = 42
+
+def load_tree(name: str) -> Dict[str, bytes]:
+    """Load a fixture tree and pre-encode every resource"""
+    with open(os.path.join(FIXTURE_DIR, name), 'r') as f:
+        tree = json.load(f)
+    return {uri.rstrip('/'): json.dumps(resource).encode() for uri, resource in tree.items()}
+
+def make_self_signed_cert(directory: str) -> Tuple[str, str]:
+    """Create a throwaway self-signed certificate with openssl"""
+    certfile = os.path.join(directory, "sim.crt")
+    keyfile = os.path.join(directory, "sim.key")
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=ilo-simulator', '-keyout', keyfile, '-out', certfile],
+        check=True, capture_output=True
+    )
+    return certfile, keyfile
+
+class SimulatedHost:
+    """Per-host state: which tree it serves and its request counters"""
+
+    def __init__(self, index: int, version: str, tree: Dict[str, bytes]):
+        self.index = index
+        self.version = version
+        self.tree = tree
+        self.requests = 0
+        self.errors = 0
+        self.hangs = 0
+
+class RedfishHandler(BaseHTTPRequestHandler):
+    """Answers GET requests from the owning host's fixture tree"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, as a real iLO
+    server_version = "HPE-iLO-Server/1.30"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        host = server.host_for(self.connection)
+        if host is None:
+            self._reply(404, b'{"error": "unknown host"}')
+            return
+
+        config = server.sim_config
+        host.requests += 1
+
+        delay = config.latency_ms + (random.uniform(-config.jitter_ms, config.jitter_ms) if config.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+        if config.hang_rate and random.random() < config.hang_rate:
+            host.hangs += 1
+            time.sleep(config.hang_seconds)
+            self.close_connection = True
+            return
+
+        if config.error_rate and random.random() < config.error_rate:
+            host.errors += 1
+            self._reply(random.choice([500, 503]), b'{"error": {"code": "Base.1.0.InternalError"}}')
+            return
+
+        body = host.tree.get(self.path.split('?', 1)[0].rstrip('/'))
+        if body is None:
+            self._reply(404, b'{"error": {"code": "Base.1.0.ResourceMissingAtURI"}}')
+        else:
+            self._reply(200, body)
+
+    def _reply(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class SimulatorServer(ThreadingHTTPServer):
+    """Threaded HTTP(S) server for one listening port"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address: Tuple[str, int], hosts: Dict[Any, SimulatedHost], sim_config: SimulatorConfig,
+                 ssl_context: Optional[ssl.SSLContext]):
+        self.hosts = hosts
+        self.sim_config = sim_config
+        self.ssl_context = ssl_context
+        super().__init__(address, RedfishHandler)
+
+    def host_for(self, connection: socket.socket) -> Optional[SimulatedHost]:
+        """Identify the simulated host by the local address or port that was dialled"""
+        local_address, local_port = connection.getsockname()[:2]
+        if self.sim_config.mode == "ports":
+            return self.hosts.get(local_port)
+        return self.hosts.get(local_address)
+
+    def finish_request(self, request, client_address):
+        # Headers and body are separate writes; avoid Nagle/delayed-ACK stalls on keep-alive
+        request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Handshake in the per-connection thread so it does not serialise accepts
+        if self.ssl_context:
+            if self.sim_config.tls_delay_ms:
+                time.sleep(self.sim_config.tls_delay_ms / 1000.0)
+            try:
+                request = self.ssl_context.wrap_socket(request, server_side=True)
+            except (ssl.SSLError, OSError):
+                return
+        super().finish_request(request, client_address)
+
+class RedfishSimulator:
+    """A fleet of simulated iLOs served from one process"""
+
+    def __init__(self, config: SimulatorConfig, certfile: Optional[str] = None, keyfile: Optional[str] = None):
+        self.config = config
+        self.servers = []
+        self.threads = []
+        self.hosts = []
+        self._tempdir = None
+
+        self.ssl_context = None
+        if config.tls:
+            if not certfile:
+                self._tempdir = tempfile.TemporaryDirectory()
+                certfile, keyfile = make_self_signed_cert(self._tempdir.name)
+            self.ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self.ssl_context.load_cert_chain(certfile, keyfile)
+
+        trees = {"4": load_tree("redfish_ilo4.json"), "5": load_tree("redfish_ilo5.json")}
+        rng = random.Random(config.seed)
+        for index in range(config.hosts):
+            version = "4" if rng.randrange(100) < config.ilo4_percent else "5"
+            self.hosts.append(SimulatedHost(index, version, trees[version]))
+
+    def endpoints(self) -> List[Dict[str, Any]]:
+        """Return hostname, port and iLO version for every simulated host"""
+        return [{"hostname": self._address(host.index), "port": self._port(host.index), "version": host.version}
+                for host in self.hosts]
+
+    def _address(self, index: int) -> str:
+        if self.config.mode == "ports":
+            return "127.0.0.1"
+        # Skip .0 and .255 in the last octet
+        return f"127.0.{1 + index // 254}.{1 + index % 254}"
+
+    def _port(self, index: int) -> int:
+        return self.config.port + index if self.config.mode == "ports" else self.config.port
+
+    def start(self) -> None:
+        """Start listening on every port"""
+        if self.config.mode == "ports":
+            for host in self.hosts:
+                self._serve(("127.0.0.1", self._port(host.index)), {self._port(host.index): host})
+        else:
+            self._serve(("", self.config.port), {self._address(host.index): host for host in self.hosts})
+
+    def _serve(self, address: Tuple[str, int], hosts: Dict[Any, SimulatedHost]) -> None:
+        server = SimulatorServer(address, hosts, self.config, self.ssl_context)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.servers.append(server)
+        self.threads.append(thread)
+
+    def stop(self) -> None:
+        """Stop all servers"""
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        if self._tempdir:
+            self._tempdir.cleanup()
+
+    def stats(self) -> Dict[str, int]:
+        """Aggregate request counters across the fleet"""
+        return {
+            "requests": sum(host.requests for host in self.hosts),
+            "errors": sum(host.errors for host in self.hosts),
+            "hangs": sum(host.hangs for host in self.hosts)
+        }
+
+def add_simulator_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the simulator options (shared with load_test.py)"""
+    parser.add_argument("--hosts", type=int, default=10, help="Number of simulated iLOs")
+    parser.add_argument("--mode", choices=["loopback", "ports"], default="loopback",
+                       help="One loopback address per host on a shared port, or one port per host")
+    parser.add_argument("--port", type=int, default=8443, help="Shared port, or first port in ports mode")
+    parser.add_argument("--ilo4-percent", type=int, default=30, help="Percentage of hosts serving iLO 4")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Uniform +/- jitter on the latency")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests answered 500/503")
+    parser.add_argument("--hang-rate", type=float, default=0, help="Fraction of requests that never answer")
+    parser.add_argument("--hang-seconds", type=float, default=300, help="How long a hung request stalls")
+    parser.add_argument("--no-tls", action="store_true", help="Serve plain HTTP")
+    parser.add_argument("--tls-delay-ms", type=float, default=0, help="Added cost per TLS handshake")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the iLO 4/5 host mix")
+
+def simulator_config_from_args(args: argparse.Namespace) -> SimulatorConfig:
+    """Build a SimulatorConfig from parsed arguments"""
+    return SimulatorConfig(
+        hosts=args.hosts, mode=args.mode, port=args.port, ilo4_percent=args.ilo4_percent,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        hang_rate=args.hang_rate, hang_seconds=args.hang_seconds, tls=not args.no_tls,
+        tls_delay_ms=args.tls_delay_ms, seed=args.seed
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated Redfish/iLO fleet")
+    add_simulator_arguments(parser)
+    parser.add_argument("--certfile", help="TLS certificate (default: generated self-signed)")
+    parser.add_argument("--keyfile", help="TLS private key")
+    parser.add_argument("--write-config", help="Write an ilo_config.json for the simulated fleet")
+    args = parser.parse_args()
+
+    simulator = RedfishSimulator(simulator_config_from_args(args), args.certfile, args.keyfile)
+    simulator.start()
+
+    if args.write_config:
+        hosts = [dict(endpoint, username="sim", password="sim", ssl_verify=False, timeout=30)
+                 for endpoint in simulator.endpoints()]
+        with open(args.write_config, 'w') as f:
+            json.dump({"ilo_hosts": hosts}, f, indent=2)
+
+    print(f"Simulating {args.hosts} iLOs ({args.mode} mode, port {args.port}); Ctrl-C to stop", flush=True)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while True:
+            time.sleep(10)
+            print(json.dumps(simulator.stats()), flush=True)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        simulator.stop()
+
+if __name__ == "__main__":
+    main()
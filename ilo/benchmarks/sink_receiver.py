@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Stand-in receiver for the ilo_monitor.py HTTP output sinks
+
+Accepts Prometheus remote_write (POST /api/v1/write, snappy protobuf) and
+InfluxDB 2.x writes (POST /api/v2/write, optionally gzip line protocol),
+decodes every request the way the real servers would and keeps counters.
+GET /stats returns them as JSON. Used by test_output_sinks.sh and for
+load-testing the sinks without a Prometheus or InfluxDB install.
+
+Usage:
+  python3 benchmarks/sink_receiver.py --port 19090
+  python3 benchmarks/sink_receiver.py --port 19090 --status 503   # simulate an overloaded server
+"""
+
+import json
+import sys
+import argparse
+import gzip
+import signal
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Tuple
+
+def snappy_decompress(data: bytes) -> bytes:
+    """Decode a snappy block (literals and 1/2/4-byte offset copies)"""
+    length, pos = read_varint(data, 0)
+    out = bytearray()
+    while pos < len(data):
+        tag = data[pos]
+        pos += 1
+        kind = tag & 0x03
+        if kind == 0:
+            size = tag >> 2
+            if size >= 60:
+                extra = size - 59
+                size = int.from_bytes(data[pos:pos + extra], 'little')
+                pos += extra
+            size += 1
+            out += data[pos:pos + size]
+            pos += size
+            continue
+        if kind == 1:
+            size = ((tag >> 2) & 0x07) + 4
+            offset = ((tag >> 5) << 8) | data[pos]
+            pos += 1
+        elif kind == 2:
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos:pos + 2], 'little')
+            pos += 2
+        else:
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos:pos + 4], 'little')
+            pos += 4
+        for _ in range(size):
+            out.append(out[-offset])
+    if len(out) != length:
+        raise ValueError(f"snappy length mismatch: {len(out)} != {length}")
+    return bytes(out)
+
+def read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+def read_fields(data: bytes) -> List[Tuple[int, Any]]:
+    """Decode one protobuf message into (field number, value) pairs"""
+    fields = []
+    pos = 0
+    while pos < len(data):
+        key, pos = read_varint(data, pos)
+        number, wire_type = key >> 3, key & 0x07
+        if wire_type == 0:
+            value, pos = read_varint(data, pos)
+        elif wire_type == 1:
+            value = struct.unpack("<d", data[pos:pos + 8])[0]
+            pos += 8
+        elif wire_type == 2:
+            size, pos = read_varint(data, pos)
+            value = data[pos:pos + size]
+            pos += size
+        else:
+            raise ValueError(f"unsupported wire type {wire_type}")
+        fields.append((number, value))
+    return fields
+
+def decode_write_request(data: bytes) -> List[Dict[str, Any]]:
+    """Decode a prometheus.WriteRequest into [{"labels": {...}, "samples": [(value, ts_ms)]}]"""
+    series = []
+    for number, timeseries in read_fields(data):
+        if number != 1:
+            continue
+        labels = {}
+        samples = []
+        for field, value in read_fields(timeseries):
+            if field == 1:
+                label = dict(read_fields(value))
+                labels[label[1].decode()] = label[2].decode()
+            elif field == 2:
+                point = dict(read_fields(value))
+                samples.append((point.get(1, 0.0), point.get(2, 0)))
+        names = list(labels)
+        if names != sorted(names):
+            raise ValueError(f"labels not sorted: {names}")
+        series.append({"labels": labels, "samples": samples})
+    return series
+
+class ReceiverHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.server.lock:
+                body = json.dumps(self.server.stats).encode()
+            self._reply(200, body)
+        else:
+            self._reply(404, b"")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        stats = self.server.stats
+        if self.server.status != 204:
+            with self.server.lock:
+                stats["refused"] += 1
+            self._reply(self.server.status, b"overloaded")
+            return
+        try:
+            if self.path.startswith("/api/v1/write"):
+                series = decode_write_request(snappy_decompress(body))
+                with self.server.lock:
+                    stats["remote_write_requests"] += 1
+                    stats["remote_write_series"] += len(series)
+                    for item in series:
+                        stats["metric_names"][item["labels"]["__name__"]] = item["labels"]
+            elif self.path.startswith("/api/v2/write"):
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                lines = [line for line in body.decode().split("\n") if line]
+                with self.server.lock:
+                    stats["influx_requests"] += 1
+                    stats["influx_lines"] += len(lines)
+                    stats["influx_timestamps"] = sorted(set(stats["influx_timestamps"])
+                                                        | {line.rsplit(" ", 1)[1] for line in lines})
+            else:
+                self._reply(404, b"")
+                return
+        except (ValueError, IndexError, KeyError, OSError) as e:
+            with self.server.lock:
+                stats["bad_requests"] += 1
+            self._reply(400, str(e).encode())
+            return
+        self._reply(204, b"")
+
+    def _reply(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in Prometheus remote_write / InfluxDB write receiver")
+    parser.add_argument("--port", type=int, default=19090, help="Port to listen on (127.0.0.1)")
+    parser.add_argument("--status", type=int, default=204, help="Answer every write with this status")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), ReceiverHandler)
+    server.daemon_threads = True
+    server.status = args.status
+    server.lock = threading.Lock()
+    server.stats = {"remote_write_requests": 0, "remote_write_series": 0, "metric_names": {},
+                    "influx_requests": 0, "influx_lines": 0, "influx_timestamps": [],
+                    "bad_requests": 0, "refused": 0}
+
+    print(f"Receiving on 127.0.0.1:{args.port}", flush=True)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+HP iLO hardware monitor package behind ilo_monitor.py
+
+Names are re-exported lazily: ``from ilomon import iLOMonitor`` only imports
+the modules that name needs, so a local run never loads the HTTP client,
+the sinks or the fleet collector.
+"""
+
+from importlib import import_module
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "iLOConfig": "config",
+    "load_config": "config",
+    "host_key": "config",
+    "iLOMonitor": "monitor",
+    "collect_output": "monitor",
+    "LocalCollector": "local",
+    "RedfishCollector": "redfish",
+    "discover_plan": "discovery",
+    "fixed_plan": "discovery",
+    "model_plan": "discovery",
+    "plan_key": "discovery",
+    "RedfishSession": "transport",
+    "STATUS_NUMERIC": "samples",
+    "STATUS_TAGS": "samples",
+    "HEADER_KEYS": "samples",
+    "Sample": "samples",
+    "samples_from_metrics": "samples",
+    "escape_tag": "samples",
+    "NDJSON_SCHEMA_VERSION": "jsonio",
+    "json_loads": "jsonio",
+    "json_dumps_compact": "jsonio",
+    "encode_ndjson": "jsonio",
+    "PROMETHEUS_FAMILIES": "remote_write",
+    "PROMETHEUS_SINGLE_SERIES": "remote_write",
+    "prometheus_family": "remote_write",
+    "prometheus_name": "remote_write",
+    "snappy_compress": "remote_write",
+    "encode_write_request": "remote_write",
+    "WindowSampler": "sampler",
+    "HistoryRing": "history",
+    "history_path": "history",
+    "RollupAggregator": "rollup",
+    "host_summary": "rollup",
+    "TREND_RULES": "trends",
+    "TrendDetector": "trends",
+    "DELTA_THRESHOLDS": "delta",
+    "DeltaTracker": "delta",
+    "SocketSink": "sinks",
+    "HTTPSink": "sinks",
+    "InfluxWriteSink": "sinks",
+    "RemoteWriteSink": "sinks",
+    "SINK_TYPES": "sinks",
+    "OutputSpool": "sinks",
+    "SinkWriter": "sinks",
+    "rendezvous_owner": "fleet",
+    "select_shard": "fleet",
+    "MonitorGroup": "fleet",
+    "run_collection_cycle": "fleet",
+    "CollectorPool": "fleet",
+    "config_file_mtime": "runner",
+    "shard_configs": "runner",
+    "main": "cli",
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
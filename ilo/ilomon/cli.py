@@ -0,0 +1,84 @@
+"""
+Command line entry point
+
+Telegraf runs ``ilo_monitor.py --local`` on every physical host each
+interval, so that invocation is parsed by hand and collected through the
+smallest set of imports. Everything else goes to the full argparse command
+line in runner.py.
+"""
+
+import sys
+from typing import Dict, List, Optional, Any
+
+from .config import iLOConfig
+from .logs import setup_logging
+from .monitor import iLOMonitor, collect_output
+
+# Options a plain local run accepts: destination and allowed values
+OUTPUT_FORMATS = ("json", "telegraf", "ndjson", "ndjson-metric")
+LOCAL_OPTIONS = {
+    "--output": ("output", OUTPUT_FORMATS),
+    "-o": ("output", OUTPUT_FORMATS),
+    "--version": ("version", ("4", "5")),
+    "-v": ("version", ("4", "5")),
+}
+
+def parse_local_args(argv: List[str]) -> Optional[Dict[str, Any]]:
+    """Parse a plain ``--local [--output F] [--version V] [--debug]`` run without argparse.
+    
+    Returns None for anything else (other options, abbreviations, --help or
+    invalid values) so the full parser handles it and reports errors.
+    """
+    if "--local" not in argv:
+        return None
+    
+    options = {"output": "telegraf", "version": "5", "debug": False}
+    args = iter(argv)
+    for arg in args:
+        if arg == "--local":
+            continue
+        if arg == "--debug":
+            options["debug"] = True
+            continue
+        name, sep, value = arg.partition("=")
+        if name not in LOCAL_OPTIONS:
+            return None
+        if not sep:
+            value = next(args, None)
+        dest, choices = LOCAL_OPTIONS[name]
+        if value not in choices:
+            return None
+        options[dest] = value
+    return options
+
+def run_local(output: str, version: str, debug: bool = False) -> None:
+    """Collect the local host once and print it"""
+    if debug:
+        setup_logging(debug=True)
+    
+    monitor = iLOMonitor(iLOConfig(
+        hostname="localhost",
+        username="",
+        password="",
+        version=version,
+        local_mode=True
+    ))
+    try:
+        result = collect_output(monitor, output, None)
+        if result:
+            print(result)
+        sys.stdout.flush()
+    finally:
+        monitor.close()
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    
+    options = parse_local_args(argv)
+    if options is not None:
+        run_local(**options)
+        return
+    
+    # argparse, the fleet collector and the sinks are only loaded from here on
+    from .runner import main as run_command_line
+    run_command_line(argv)
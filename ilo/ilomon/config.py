@@ -0,0 +1,70 @@
+"""
+Per-host configuration and the ilo_config.json loader
+"""
+
+import json
+from typing import Dict, List
+from dataclasses import dataclass, field
+
+from .logs import get_logger
+
+@dataclass
+class iLOConfig:
+    """Configuration for iLO connection"""
+    hostname: str
+    username: str
+    password: str
+    version: str  # "4" or "5"
+    port: int = 443
+    ssl_verify: bool = False
+    timeout: int = 30
+    local_mode: bool = False  # True for local host monitoring
+    cache_dir: str = "/var/tmp/ilo-monitor"  # State kept between exec runs
+    storage_detail_interval: int = 900  # Seconds between full storage topology scans
+    smart_attribute_interval: int = 300  # Seconds between SMART attribute refreshes
+    smart_max_workers: int = 8  # Concurrent smartctl processes
+    thermal_plan_interval: int = 3600  # Seconds between thermal source re-validation (0 = run all)
+    discovery_interval: int = 86400  # Seconds between Redfish fetch plan re-discovery (0 = fixed iLO URIs)
+    tags: Dict[str, str] = field(default_factory=dict)  # Extra tags added to every series of this host
+
+def load_config(config_file: str) -> List[iLOConfig]:
+    """Load iLO configurations from JSON file; [] (with the error logged to stderr) if it cannot be read"""
+    try:
+        with open(config_file, 'r') as f:
+            config_data = json.load(f)
+        
+        # Host entries may override these collector-wide defaults
+        settings = config_data.get("monitoring_settings", {})
+        
+        configs = []
+        for ilo_data in config_data.get("ilo_hosts", []):
+            configs.append(iLOConfig(
+                hostname=ilo_data.get("hostname", "localhost"),
+                username=ilo_data.get("username", ""),
+                password=ilo_data.get("password", ""),
+                version=str(ilo_data.get("version", "5")),
+                port=ilo_data.get("port", 443),
+                ssl_verify=ilo_data.get("ssl_verify", False),
+                timeout=ilo_data.get("timeout", 30),
+                local_mode=ilo_data.get("local_mode", False),
+                cache_dir=ilo_data.get("cache_dir", settings.get("cache_dir", "/var/tmp/ilo-monitor")),
+                storage_detail_interval=ilo_data.get("storage_detail_interval",
+                                                     settings.get("storage_detail_interval", 900)),
+                smart_attribute_interval=ilo_data.get("smart_attribute_interval",
+                                                      settings.get("smart_attribute_interval", 300)),
+                smart_max_workers=ilo_data.get("smart_max_workers", settings.get("smart_max_workers", 8)),
+                thermal_plan_interval=ilo_data.get("thermal_plan_interval",
+                                                   settings.get("thermal_plan_interval", 3600)),
+                discovery_interval=ilo_data.get("discovery_interval", settings.get("discovery_interval", 86400)),
+                tags={key: str(value) for key, value in ilo_data.get("tags", {}).items()}
+            ))
+        
+        return configs
+    except Exception as e:
+        # Not on stdout: Telegraf execd would parse it as line protocol
+        get_logger(__name__).error(f"Error loading config {config_file}: {e}")
+        return []
+
+def host_key(config: iLOConfig) -> str:
+    """Identity of a configured host across config reloads"""
+    return f"{config.hostname}:{config.port}"
@@ -0,0 +1,127 @@
+"""
+Change-only output filtering (--delta)
+"""
+
+import json
+import logging
+import os
+import re
+from typing import Dict, List, Optional
+
+from .samples import Sample
+
+# Minimum absolute change before a noisy field counts as changed in delta mode
+DELTA_THRESHOLDS = {
+    "value": 1.0,
+    "temperature_celsius": 1.0,
+    "current_watts": 5,
+    "average_watts": 5,
+    "load_1min": 0.5,
+    "load_5min": 0.5,
+    "load_15min": 0.5,
+    "used_mb": 256,
+    "free_mb": 256,
+    "available_mb": 256,
+    "buffers_mb": 256,
+    "cached_mb": 256,
+    "usage_percent": 1.0,
+    "uptime_seconds": 86400,
+    "total_energy_uj": float("inf"),
+    "power_on_hours": 24,
+    "watts": 5,
+    "percent": 5.0,
+    "window_seconds": float("inf"),
+    "window_samples": float("inf"),
+    "slope_per_hour": 1.0,
+    "zscore": 1.0,
+}
+
+class DeltaTracker:
+    """Change-only output filter for one monitored host.
+    
+    Remembers the last emitted value of every series and passes through only
+    series whose tags changed or whose numeric fields moved by more than the
+    field's threshold. Every ``heartbeat_cycles`` cycles all series are
+    emitted. In exec mode the state is kept in ``state_file`` between runs;
+    a daemon keeps it in memory.
+    """
+    
+    def __init__(self, heartbeat_cycles: int = 10, state_file: Optional[str] = None,
+                 thresholds: Optional[Dict[str, float]] = None):
+        self.heartbeat_cycles = max(1, heartbeat_cycles)
+        self.state_file = state_file
+        self.thresholds = thresholds if thresholds is not None else DELTA_THRESHOLDS
+        self.cycle = 0
+        self.last_emitted = {}
+        self._field_thresholds = {}
+        
+        if state_file:
+            try:
+                with open(state_file, 'r') as f:
+                    state = json.load(f)
+                self.cycle = state.get("cycle", 0)
+                self.last_emitted = {
+                    key: Sample.from_pairs(key, tags, fields)
+                    for key, (tags, fields) in state.get("last_emitted", {}).items()
+                }
+            except (IOError, ValueError, TypeError):
+                # Missing, corrupt or old-format state: start with a full emission
+                self.last_emitted = {}
+    
+    def filter(self, samples: List[Sample]) -> List[Sample]:
+        """Return the samples that should be emitted this cycle"""
+        heartbeat = self.cycle % self.heartbeat_cycles == 0
+        self.cycle += 1
+        
+        emitted = []
+        for sample in samples:
+            if heartbeat or self._changed(self.last_emitted.get(sample.key), sample):
+                emitted.append(sample)
+                self.last_emitted[sample.key] = sample
+        
+        if self.state_file:
+            self.save()
+        
+        return emitted
+    
+    def _changed(self, previous: Optional[Sample], current: Sample) -> bool:
+        """Check whether a series differs enough from its last emitted value"""
+        if previous is None or previous.layout is not current.layout:
+            return True
+        tag_count = len(current.layout[0])
+        if previous.values[:tag_count] != current.values[:tag_count]:
+            return True
+        
+        for field, value, old_value in zip(current.layout[1], current.values[tag_count:],
+                                           previous.values[tag_count:]):
+            if isinstance(value, bool) or isinstance(old_value, bool):
+                if value != old_value:
+                    return True
+            elif abs(value - old_value) > self._threshold(field):
+                return True
+        
+        return False
+    
+    def _threshold(self, field: str) -> float:
+        threshold = self._field_thresholds.get(field)
+        if threshold is None:
+            # Window statistics and trend baselines (value_max, current_watts_baseline, ...) share their
+            # field's threshold; trend slopes and z-scores share one threshold per kind
+            base_field = re.sub(r'_(min|max|mean|p95|baseline)$', '', field)
+            trend_field = re.sub(r'^.+_(slope_per_hour|zscore)$', r'\1', field)
+            threshold = self.thresholds.get(field, self.thresholds.get(base_field, self.thresholds.get(trend_field, 0)))
+            self._field_thresholds[field] = threshold
+        return threshold
+    
+    def save(self) -> None:
+        """Persist the tracker state for the next exec run"""
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            tmp_path = f"{self.state_file}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({"cycle": self.cycle,
+                           "last_emitted": {key: [sample.tags, sample.fields]
+                                            for key, sample in self.last_emitted.items()}}, f)
+            os.replace(tmp_path, self.state_file)
+        except (IOError, OSError) as e:
+            logging.getLogger(__name__).warning(f"Could not write delta state {self.state_file}: {e}")
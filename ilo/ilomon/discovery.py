@@ -0,0 +1,195 @@
+"""
+Redfish service discovery and per-model fetch plans
+
+Fixed iLO URIs (``/Systems/1/``, ``/Chassis/1/Thermal/``) picked by the
+configured ``version`` 404 on multi-node chassis and on other Redfish BMCs.
+Discovery walks the service root once, follows the links to the system,
+its chassis and its collections, and compiles a fetch plan: the exact URIs
+the collectors read, whether collections can be expanded inline, and which
+field names this firmware uses. The URIs belong to the host (two nodes of
+one multi-node chassis differ), while the field names and $expand support
+are keyed by vendor, model and firmware so every host of the model shares
+them.
+"""
+
+import re
+import time
+from typing import Callable, Dict, List, Optional, Any
+
+PLAN_SCHEMA = 2
+
+# Plan entries shared by every host of a vendor/model/firmware; the rest (URIs) is per host
+MODEL_PLAN_KEYS = ("schema", "key", "vendor", "model", "firmware", "manager", "dialect", "expand", "fields")
+
+# Service roots to try, the configured version's first
+API_ROOTS = {"5": ("/redfish/v1/", "/rest/v1"), "4": ("/rest/v1", "/redfish/v1/")}
+
+# Candidate field names, first match in the first list entry wins
+FIELD_CANDIDATES = {
+    "temperatures": ("Temperatures", "Temperature"),
+    "temperature_name": ("Name", "Label"),
+    "temperature_reading": ("ReadingCelsius", "CurrentReading"),
+    "fan_name": ("Name", "FanName", "Label"),
+    "fan_reading": ("Reading", "CurrentReading")
+}
+
+def fixed_plan(version: str) -> Dict[str, Any]:
+    """The hard-coded iLO 4/5 URIs, used when discovery is off or fails"""
+    if version == "5":
+        uris = {
+            "system": "/redfish/v1/Systems/1/",
+            "thermal": "/redfish/v1/Chassis/1/Thermal/",
+            "power": "/redfish/v1/Chassis/1/Power/",
+            "memory": "/redfish/v1/Systems/1/Memory/",
+            "storage": "/redfish/v1/Systems/1/Storage/"
+        }
+        dialect = "redfish"
+    else:
+        uris = {
+            "system": "/rest/v1/Systems/1",
+            "thermal": "/rest/v1/Chassis/1/Thermal",
+            "power": "/rest/v1/Chassis/1/Power",
+            "memory": None,  # Not parsed on the HP REST API
+            "storage": None
+        }
+        dialect = "hp_rest"
+    fields = {name: candidates[0] for name, candidates in FIELD_CANDIDATES.items()}
+    if dialect == "hp_rest":
+        fields.update(temperature_reading="CurrentReading", fan_name="FanName", fan_reading="CurrentReading")
+    return {
+        "schema": PLAN_SCHEMA,
+        "key": None,
+        "dialect": dialect,
+        "uris": uris,
+        "expand": False,
+        "fields": fields
+    }
+
+def model_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of a plan that is shared by every host of its model/firmware"""
+    return {name: plan[name] for name in MODEL_PLAN_KEYS if name in plan}
+
+def plan_key(vendor: str, model: str, firmware: str) -> str:
+    """File-name safe cache key for a vendor/model/firmware combination"""
+    return re.sub(r'[^a-z0-9]+', '-', f"{vendor} {model} {firmware}".lower()).strip('-')
+
+def _link(resource: Dict[str, Any], *names: str) -> Optional[str]:
+    """URI of a linked resource, in Redfish (``@odata.id``) or HP REST (``links.*.href``) form"""
+    for name in names:
+        for container in (resource, resource.get("Links", {}), resource.get("links", {})):
+            target = container.get(name)
+            if isinstance(target, list):
+                target = target[0] if target else None
+            if isinstance(target, dict):
+                uri = target.get("@odata.id") or target.get("href")
+                if uri:
+                    return uri
+    return None
+
+def _members(collection: Optional[Dict[str, Any]]) -> List[str]:
+    """Member URIs of a Redfish or HP REST collection"""
+    if not collection:
+        return []
+    entries = collection.get("Members") or collection.get("links", {}).get("Member", [])
+    return [uri for uri in (entry.get("@odata.id") or entry.get("href") for entry in entries) if uri]
+
+def _first_member(get: Callable[[str], Optional[Dict]], collection_uri: Optional[str]) -> Optional[str]:
+    """First member URI of a linked collection"""
+    members = _members(get(collection_uri)) if collection_uri else []
+    return members[0] if members else None
+
+def _pick_field(entries: List[Dict[str, Any]], candidates: tuple) -> str:
+    """First candidate field name present in the first entry"""
+    if entries:
+        for name in candidates:
+            if name in entries[0]:
+                return name
+    return candidates[0]
+
+def _firmware(manager: Dict[str, Any], root: Dict[str, Any]) -> str:
+    """Manager firmware version from the manager resource or the HPE service root extension"""
+    firmware = manager.get("FirmwareVersion") or manager.get("Firmware", {}).get("Current", {}).get("VersionString")
+    if not firmware:
+        oem = root.get("Oem", {})
+        oem_managers = (oem.get("Hpe") or oem.get("Hp") or {}).get("Manager") or [{}]
+        firmware = oem_managers[0].get("ManagerFirmwareVersion")
+    return firmware or "unknown"
+
+def discover_plan(get: Callable[[str], Optional[Dict]], version: str,
+                  cached_model: Callable[[str], Optional[Dict]]) -> Optional[Dict[str, Any]]:
+    """Walk the service root and compile a fetch plan; None if the BMC cannot be identified.
+    
+    The links to this host's system, chassis and collections are always
+    followed. Probing field names and $expand support is skipped when
+    ``cached_model`` already has the model data for this model and firmware.
+    """
+    root = None
+    for root_uri in API_ROOTS.get(version, API_ROOTS["5"]):
+        root = get(root_uri)
+        if root:
+            break
+    if not root:
+        return None
+    dialect = "redfish" if root_uri.startswith("/redfish") else "hp_rest"
+    
+    system_uri = _first_member(get, _link(root, "Systems"))
+    system = get(system_uri) if system_uri else None
+    if not system:
+        return None
+    
+    manager_uri = _link(system, "ManagedBy") or _first_member(get, _link(root, "Managers"))
+    manager = (get(manager_uri) if manager_uri else None) or {}
+    vendor = system.get("Manufacturer") or root.get("Vendor") or "unknown"
+    model = system.get("Model") or root.get("Product") or "unknown"
+    firmware = _firmware(manager, root)
+    key = plan_key(vendor, model, firmware)
+    
+    chassis_uri = _link(system, "Chassis") or _first_member(get, _link(root, "Chassis"))
+    chassis = (get(chassis_uri) if chassis_uri else None) or {}
+    uris = {
+        "system": system_uri,
+        "thermal": _link(chassis, "Thermal", "ThermalMetrics"),
+        "power": _link(chassis, "Power", "PowerMetrics"),
+        # Memory and storage are only parsed in their Redfish form
+        "memory": _link(system, "Memory") if dialect == "redfish" else None,
+        "storage": _link(system, "Storage") if dialect == "redfish" else None
+    }
+    
+    plan = {
+        "schema": PLAN_SCHEMA,
+        "key": key,
+        "timestamp": int(time.time()),
+        "vendor": vendor,
+        "model": model,
+        "firmware": firmware,
+        "manager": manager.get("Model", "unknown"),
+        "dialect": dialect,
+        "uris": uris
+    }
+    
+    model_data = cached_model(key)
+    if model_data and model_data.get("schema") == PLAN_SCHEMA and model_data.get("dialect") == dialect:
+        plan.update(expand=model_data["expand"], fields=model_data["fields"])
+        return plan
+    
+    fields = {name: candidates[0] for name, candidates in FIELD_CANDIDATES.items()}
+    thermal = get(uris["thermal"]) if uris["thermal"] else None
+    if thermal:
+        fields["temperatures"] = _pick_field([thermal], FIELD_CANDIDATES["temperatures"])
+        temperatures = thermal.get(fields["temperatures"], [])
+        fans = thermal.get("Fans", [])
+        for name in ("temperature_name", "temperature_reading"):
+            fields[name] = _pick_field(temperatures, FIELD_CANDIDATES[name])
+        for name in ("fan_name", "fan_reading"):
+            fields[name] = _pick_field(fans, FIELD_CANDIDATES[name])
+    
+    # $expand inlines collection members, saving a request per DIMM; probe it
+    # rather than trust ProtocolFeaturesSupported, which older firmware omits
+    expand = False
+    if uris["memory"] and ("ProtocolFeaturesSupported" in root or "Hpe" in root.get("Oem", {})):
+        expanded = get(f"{uris['memory']}?$expand=.")
+        members = (expanded or {}).get("Members") or [{}]
+        expand = len(members[0]) > 1
+    
+    plan.update(expand=expand, fields=fields)
+    return plan
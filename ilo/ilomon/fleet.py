@@ -0,0 +1,337 @@
+"""
+Collecting many hosts: replica sharding, per-process monitor groups and the
+multi-process collector pool
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from typing import Dict, List, Optional, Any, TYPE_CHECKING
+from dataclasses import replace
+
+from .config import iLOConfig, host_key
+from .delta import DeltaTracker
+from .history import HistoryRing, history_path
+from .monitor import iLOMonitor, collect_output, encode_output
+from .rollup import RollupAggregator
+from .sampler import WindowSampler
+
+if TYPE_CHECKING:
+    from .sinks import SinkWriter
+    from .trends import TrendDetector
+
+def rendezvous_owner(key: str, members: List[str]) -> str:
+    """Pick the member that owns a key by highest random weight hashing.
+    
+    Every replica computes the same owner without coordination, and adding
+    or removing one of N members only moves about 1/N of the keys.
+    """
+    return max(members, key=lambda member: hashlib.sha1(f"{member}|{key}".encode()).digest())
+
+def select_shard(configs: List[iLOConfig], member: str, members: List[str]) -> List[iLOConfig]:
+    """Keep the hosts owned by this replica; local-mode entries always stay"""
+    return [
+        config for config in configs
+        if config.local_mode or rendezvous_owner(host_key(config), members) == member
+    ]
+
+class MonitorGroup:
+    """The monitors collected by one process, with their samplers and delta trackers.
+    
+    Monitors (and their caches) live for the whole run so daemon mode keeps
+    them warm. update() applies a new host list and only replaces the hosts
+    whose configuration changed.
+    """
+    
+    def __init__(self, output_format: str, daemon: bool = False, sample_interval: float = 0,
+                 delta: bool = False, heartbeat: int = 10, history_seconds: int = 0,
+                 rollup_tags: Optional[List[str]] = None, trend_window: int = 0, trend_halflife: float = 86400,
+                 rollup_replica: Optional[str] = None):
+        self.output_format = output_format
+        self.daemon = daemon
+        self.sample_interval = sample_interval
+        self.delta = delta
+        self.heartbeat = heartbeat
+        self.history_seconds = history_seconds
+        self.rollup = RollupAggregator(rollup_tags, rollup_replica) if rollup_tags else None
+        self.trends = None
+        if trend_window > 0:
+            from .trends import TrendDetector
+            self.trends = TrendDetector(trend_window, trend_halflife)
+        self.monitors = {}
+        self.trackers = {}
+        self.logger = logging.getLogger(__name__)
+    
+    def update(self, configs: List[iLOConfig]) -> None:
+        """Start new or changed hosts, stop removed ones and keep the rest"""
+        wanted = {host_key(config): config for config in configs}
+        added = removed = retagged = 0
+        
+        for key in list(self.monitors):
+            if key not in wanted:
+                self._remove(key)
+                removed += 1
+        
+        for key, config in wanted.items():
+            monitor = self.monitors.get(key)
+            if monitor and monitor.config == config:
+                continue
+            if monitor and replace(monitor.config, tags=config.tags) == config:
+                # Tag-only change: keep the connection, re-emit every series with the new tags
+                monitor.set_tags(config.tags)
+                if key in self.trackers:
+                    self.trackers[key].last_emitted.clear()
+                retagged += 1
+                continue
+            if monitor:
+                self._remove(key)
+                removed += 1
+            self._add(key, config)
+            added += 1
+        
+        if added or removed or retagged:
+            self.logger.info(f"Host set updated: {added} started, {removed} stopped, {retagged} retagged, "
+                             f"{len(self.monitors)} active")
+    
+    def _add(self, key: str, config: iLOConfig) -> None:
+        monitor = iLOMonitor(config)
+        if self.daemon and self.sample_interval > 0:
+            if self.history_seconds > 0:
+                # Reopens the host's existing ring, so history carries over restarts and reloads
+                capacity = max(1, int(self.history_seconds / self.sample_interval))
+                monitor.history = HistoryRing(history_path(config.cache_dir, config.hostname, config.port), capacity)
+            monitor.sampler = WindowSampler(monitor, self.sample_interval)
+            monitor.sampler.start()
+        if self.delta:
+            state_file = None
+            if not self.daemon:
+                state_file = os.path.join(config.cache_dir, f"delta_{config.hostname}_{config.port}.json")
+            self.trackers[key] = DeltaTracker(self.heartbeat, state_file)
+        self.monitors[key] = monitor
+    
+    def _remove(self, key: str) -> None:
+        monitor = self.monitors.pop(key)
+        monitor.close()
+        self.trackers.pop(key, None)
+        if self.trends:
+            self.trends.remove_host(key)
+    
+    def run_cycle(self, writer: Optional['SinkWriter'] = None) -> None:
+        """Collect every host once and write the results to stdout or the sink"""
+        run_collection_cycle(list(self.monitors.values()), self.output_format, self.trackers, writer, self.rollup,
+                             self.trends)
+    
+    def stop(self) -> None:
+        """Stop every monitor"""
+        for key in list(self.monitors):
+            self._remove(key)
+
+def run_collection_cycle(monitors: List[iLOMonitor], output_format: str,
+                         trackers: Dict[str, DeltaTracker], writer: Optional['SinkWriter'] = None,
+                         rollup: Optional[RollupAggregator] = None, trends: Optional['TrendDetector'] = None) -> None:
+    """Collect from every monitor once and write the results to stdout or the sink (trackers by host_key)"""
+    streaming = output_format.startswith("ndjson")
+    all_outputs = []
+    outputs = collect_outputs(monitors, output_format, trackers, rollup, trends)
+    if rollup:
+        rollup.reset()
+        outputs = _with_rollups(outputs, rollup, output_format)
+    for output in outputs:
+        if output and writer:
+            writer.write(output)
+        elif output and streaming:
+            # One record (or record set) per host, visible as soon as it is collected
+            print(output, flush=True)
+        elif output:
+            all_outputs.append(output)
+    
+    # Output results
+    for output in all_outputs:
+        print(output)
+        if len(all_outputs) > 1:
+            print()  # Separator between hosts
+    sys.stdout.flush()
+
+def collect_outputs(monitors: List[iLOMonitor], output_format: str, trackers: Dict[str, DeltaTracker],
+                    rollup: Optional[RollupAggregator] = None, trends: Optional['TrendDetector'] = None) -> Any:
+    """Yield the encoded output of every monitor for one cycle.
+    
+    With trend detection every host is collected before any is encoded, so
+    the trends of all their sensors are computed in one pass.
+    """
+    if not trends:
+        for monitor in monitors:
+            yield collect_output(monitor, output_format, trackers.get(host_key(monitor.config)), rollup)
+        return
+    collected = [(monitor, monitor.collect_all_metrics()) for monitor in monitors]
+    trends.update([(host_key(monitor.config), metrics) for monitor, metrics in collected])
+    for monitor, metrics in collected:
+        yield encode_output(monitor, metrics, output_format, trackers.get(host_key(monitor.config)), rollup)
+
+def _with_rollups(outputs: Any, rollup: RollupAggregator, output_format: str) -> Any:
+    """Yield the host outputs, then the cycle's rollups once every host has been counted"""
+    yield from outputs
+    yield rollup.encode(output_format, int(time.time()))
+
+def _collector_worker(worker_id: int, configs: List[iLOConfig], options: Dict[str, Any],
+                      commands: Any, results: Any) -> None:
+    """Worker process: own a set of hosts and collect them on each request"""
+    group = MonitorGroup(options["output_format"], options["daemon"], options["sample_interval"],
+                         options["delta"], options["heartbeat"], options["history_seconds"], options["rollup_tags"],
+                         options["trend_window"], options["trend_halflife"])
+    group.update(configs)
+    if options["debug"]:
+        logging.getLogger().setLevel(logging.DEBUG)
+    try:
+        while True:
+            command, payload = commands.recv()
+            if command == "update":
+                group.update(payload)
+                continue
+            if command != "collect":
+                break
+            batch = []
+            if group.rollup:
+                group.rollup.reset()
+            for output in collect_outputs(list(group.monitors.values()), group.output_format, group.trackers,
+                                          group.rollup, group.trends):
+                if output:
+                    batch.append(output)
+                if len(batch) >= CollectorPool.BATCH_SIZE:
+                    results.put((worker_id, batch, None))
+                    batch = []
+            # The last message of a cycle carries this worker's rollup groups for the parent to merge
+            results.put((worker_id, batch, group.rollup.groups if group.rollup else {}))
+    except (KeyboardInterrupt, EOFError):
+        pass
+    finally:
+        group.stop()
+
+class CollectorPool:
+    """Spread hosts over worker processes to get past the GIL on large fleets.
+    
+    Each worker keeps its own monitors, and so its own HTTP connection pools,
+    caches and delta state, for the life of the pool. Hosts are assigned by
+    rendezvous hashing so they stay on the same worker. Output is written in
+    batches as workers finish them, in no particular host order. Rollups
+    are merged from every worker's groups and written after the last batch.
+    A worker that dies is restarted with its hosts before the next cycle.
+    """
+    
+    BATCH_SIZE = 16  # Hosts per result message
+    
+    def __init__(self, configs: List[iLOConfig], workers: int, output_format: str, daemon: bool = False,
+                 sample_interval: float = 0, delta: bool = False, heartbeat: int = 10, history_seconds: int = 0,
+                 rollup_tags: Optional[List[str]] = None, trend_window: int = 0, trend_halflife: float = 86400,
+                 rollup_replica: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.output_format = output_format
+        self.rollup = RollupAggregator(rollup_tags, rollup_replica) if rollup_tags else None
+        self.separate_hosts = len(configs) > 1 and not output_format.startswith("ndjson")
+        self.results = multiprocessing.Queue()
+        self.processes = {}
+        self.commands = {}
+        self.assignments = {}
+        self.members = [f"worker-{i}" for i in range(workers)]
+        
+        # Every worker is started, even without hosts, so reloads can hand it some
+        self.options = {"output_format": output_format, "daemon": daemon, "sample_interval": sample_interval,
+                   "delta": delta, "heartbeat": heartbeat, "history_seconds": history_seconds,
+                   "rollup_tags": rollup_tags, "trend_window": trend_window, "trend_halflife": trend_halflife,
+                   "debug": logging.getLogger().level == logging.DEBUG}
+        for worker_id, assigned in enumerate(self._assign(configs)):
+            self._start_worker(worker_id, assigned)
+    
+    def _start_worker(self, worker_id: int, assigned: List[iLOConfig]) -> None:
+        parent_end, child_end = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=_collector_worker, name=f"ilo-worker-{worker_id}",
+                                          daemon=True,
+                                          args=(worker_id, assigned, self.options, child_end, self.results))
+        process.start()
+        self.processes[worker_id] = process
+        self.commands[worker_id] = parent_end
+        self.assignments[worker_id] = assigned
+    
+    def _restart_dead_workers(self) -> None:
+        """Start a replacement for every worker that has exited, with the same hosts"""
+        for worker_id, process in list(self.processes.items()):
+            if not process.is_alive():
+                self.logger.error(f"Collector worker {worker_id} exited (code {process.exitcode}), "
+                                  f"restarting it with {len(self.assignments[worker_id])} hosts")
+                self.commands[worker_id].close()
+                self._start_worker(worker_id, self.assignments[worker_id])
+    
+    def _assign(self, configs: List[iLOConfig]) -> List[List[iLOConfig]]:
+        """Split hosts over the workers by rendezvous hashing"""
+        assignments = {member: [] for member in self.members}
+        for config in configs:
+            assignments[rendezvous_owner(host_key(config), self.members)].append(config)
+        return [assignments[member] for member in self.members]
+    
+    def update(self, configs: List[iLOConfig]) -> None:
+        """Send every worker its share of a new host list"""
+        self.separate_hosts = len(configs) > 1 and not self.output_format.startswith("ndjson")
+        for worker_id, assigned in enumerate(self._assign(configs)):
+            self.assignments[worker_id] = assigned
+            if self.processes[worker_id].is_alive():
+                self.commands[worker_id].send(("update", assigned))
+    
+    def run_cycle(self, writer: Optional['SinkWriter'] = None) -> None:
+        """Run one collection cycle on every worker and write batches as they arrive"""
+        self._restart_dead_workers()
+        pending = set()
+        for worker_id, connection in self.commands.items():
+            try:
+                connection.send(("collect", None))
+            except OSError:
+                continue  # Died since the check; restarted next cycle
+            pending.add(worker_id)
+        if self.rollup:
+            self.rollup.reset()
+        
+        while pending:
+            try:
+                worker_id, batch, rollup_groups = self.results.get(timeout=1)
+            except queue.Empty:
+                for worker_id in list(pending):
+                    if not self.processes[worker_id].is_alive():
+                        # Its hosts are skipped this cycle; it is restarted before the next one
+                        self.logger.error(f"Collector worker {worker_id} exited mid-cycle "
+                                          f"(code {self.processes[worker_id].exitcode})")
+                        pending.discard(worker_id)
+                continue
+            
+            for output in batch:
+                if writer:
+                    writer.write(output)
+                    continue
+                print(output)
+                if self.separate_hosts:
+                    print()  # Separator between hosts
+            sys.stdout.flush()
+            if rollup_groups is not None:
+                pending.discard(worker_id)
+                if self.rollup:
+                    self.rollup.merge(rollup_groups)
+        
+        output = self.rollup.encode(self.output_format, int(time.time())) if self.rollup else None
+        if output and writer:
+            writer.write(output)
+        elif output:
+            print(output, flush=True)
+    
+    def stop(self) -> None:
+        """Ask every worker to exit and wait for them"""
+        for connection in self.commands.values():
+            try:
+                connection.send(("stop", None))
+            except OSError:
+                pass
+        for process in self.processes.values():
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,173 @@
+"""
+High-resolution per-host history in a memory-mapped ring buffer
+
+The window sampler summarises its readings into one set of statistics per
+output cycle, which is too coarse to reconstruct what led up to a thermal
+trip or a PSU loss. With ``--history-seconds`` every sample is also kept
+in a fixed-size ring file per host under ``cache_dir/history/``. Because the
+file is memory-mapped, the history survives restarts and can be read by
+``--dump-history`` while the daemon is running.
+"""
+
+import csv
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, TextIO, Tuple
+
+HISTORY_MAGIC = b"ILOHIST1"
+HISTORY_MAX_COLUMNS = 64  # Series per host; later ones are not recorded
+DUMP_MIN_INTERVAL = 600  # Seconds between automatic dumps of one host
+
+# magic, capacity (rows), max columns, columns in use, reserved, rows ever written
+_HEADER = struct.Struct("<8sIIIIQ")
+_HEADER_SIZE = 64
+_WRITTEN_OFFSET = 24
+_COLUMNS_OFFSET = 16
+_NAME_SIZE = 64
+_NAN = struct.pack("<f", math.nan)
+
+def history_path(cache_dir: str, hostname: str, port: int) -> str:
+    """Ring file of one host"""
+    return os.path.join(cache_dir, "history", f"{hostname}_{port}.ring")
+
+class HistoryRing:
+    """Fixed-size ring of timestamped samples for one host, stored column by column.
+    
+    The file holds a 64-byte header, ``max_columns`` 64-byte column names,
+    a float64 timestamp column and one float32 column per series, each
+    ``capacity`` rows long. Columns a host never uses are never written,
+    so they stay sparse on disk. The row counter is bumped after a row is
+    complete, so a crash loses at most the sample being written.
+    """
+    
+    def __init__(self, path: str, capacity: int = 0, max_columns: int = HISTORY_MAX_COLUMNS,
+                 readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        self.lock = threading.Lock()
+        self.dropped = set()
+        
+        header = None
+        if os.path.exists(path) and os.path.getsize(path) >= _HEADER_SIZE:
+            with open(path, 'rb') as f:
+                header = _HEADER.unpack(f.read(_HEADER.size))
+            if header[0] != HISTORY_MAGIC:
+                header = None
+        
+        if readonly:
+            if header is None:
+                raise ValueError(f"{path} is not a history ring file")
+            capacity, max_columns = header[1], header[2]
+        elif header is None or header[1:3] != (capacity, max_columns):
+            # New host, or the ring was resized: start an empty file
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.truncate(self._file_size(capacity, max_columns))
+                f.write(_HEADER.pack(HISTORY_MAGIC, capacity, max_columns, 0, 0, 0))
+        
+        self.capacity = capacity
+        self.max_columns = max_columns
+        self.timestamps_offset = _HEADER_SIZE + max_columns * _NAME_SIZE
+        self.columns_offset = self.timestamps_offset + capacity * 8
+        
+        self.file = open(path, 'rb' if readonly else 'r+b')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE)
+        _, _, _, column_count, _, self.written = _HEADER.unpack_from(self.mm, 0)
+        self.columns = [self._read_name(index) for index in range(column_count)]
+        self.index = {name: i for i, name in enumerate(self.columns)}
+    
+    @staticmethod
+    def _file_size(capacity: int, max_columns: int) -> int:
+        return _HEADER_SIZE + max_columns * _NAME_SIZE + capacity * (8 + 4 * max_columns)
+    
+    def _read_name(self, index: int) -> str:
+        offset = _HEADER_SIZE + index * _NAME_SIZE
+        return self.mm[offset:offset + _NAME_SIZE].rstrip(b"\0").decode("utf-8", "replace")
+    
+    def _add_column(self, name: str) -> Optional[int]:
+        """Register a new series; earlier rows read as missing"""
+        if len(self.columns) >= self.max_columns:
+            return None
+        index = len(self.columns)
+        offset = _HEADER_SIZE + index * _NAME_SIZE
+        self.mm[offset:offset + _NAME_SIZE] = name.encode("utf-8")[:_NAME_SIZE].ljust(_NAME_SIZE, b"\0")
+        column = self.columns_offset + index * self.capacity * 4
+        self.mm[column:column + self.capacity * 4] = _NAN * self.capacity
+        self.columns.append(name)
+        self.index[name] = index
+        struct.pack_into("<I", self.mm, _COLUMNS_OFFSET, len(self.columns))
+        return index
+    
+    def append(self, timestamp: float, values: Dict[str, float]) -> None:
+        """Write one sample row, overwriting the oldest once the ring is full"""
+        with self.lock:
+            for name in values:
+                if name not in self.index and name not in self.dropped and self._add_column(name) is None:
+                    self.dropped.add(name)
+            
+            row = self.written % self.capacity
+            struct.pack_into("<d", self.mm, self.timestamps_offset + row * 8, timestamp)
+            for index, name in enumerate(self.columns):
+                struct.pack_into("<f", self.mm, self.columns_offset + (index * self.capacity + row) * 4,
+                                 values.get(name, math.nan))
+            self.written += 1
+            struct.pack_into("<Q", self.mm, _WRITTEN_OFFSET, self.written)
+    
+    def read(self) -> Tuple[List[float], Dict[str, List[float]]]:
+        """Timestamps and per-series values, oldest first; missing values are NaN"""
+        with self.lock:
+            written = struct.unpack_from("<Q", self.mm, _WRITTEN_OFFSET)[0]
+            column_count = struct.unpack_from("<I", self.mm, _COLUMNS_OFFSET)[0]
+            while len(self.columns) < column_count:
+                self.columns.append(self._read_name(len(self.columns)))
+            count = min(written, self.capacity)
+            first = (written - count) % self.capacity
+            
+            def ordered(typecode: str, offset: int, size: int) -> List[float]:
+                column = array(typecode, self.mm[offset:offset + self.capacity * size])
+                if sys.byteorder == "big":
+                    column.byteswap()
+                return (column[first:] + column[:first]).tolist() if count == self.capacity else column[:count].tolist()
+            
+            timestamps = ordered("d", self.timestamps_offset, 8)
+            series = {name: ordered("f", self.columns_offset + index * self.capacity * 4, 4)
+                      for index, name in enumerate(self.columns[:column_count])}
+        return timestamps, series
+    
+    def write_csv(self, out: TextIO) -> int:
+        """Write the history as CSV (timestamp column, then one column per series); returns the row count"""
+        timestamps, series = self.read()
+        names = list(series)
+        writer = csv.writer(out)
+        writer.writerow(["timestamp"] + names)
+        for row, timestamp in enumerate(timestamps):
+            writer.writerow([f"{timestamp:.3f}"] + [
+                "" if math.isnan(series[name][row]) else f"{series[name][row]:.6g}" for name in names
+            ])
+        return len(timestamps)
+    
+    def dump(self, directory: str, reason: str) -> str:
+        """Write the history to a timestamped CSV file in ``directory`` and return its path"""
+        os.makedirs(directory, exist_ok=True)
+        name = os.path.basename(self.path)[:-len(".ring")]
+        label = "".join(c if c.isalnum() or c in "-_" else "_" for c in reason)
+        path = os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{label}.csv")
+        with open(path, 'w', newline='') as f:
+            self.write_csv(f)
+        return path
+    
+    def close(self) -> None:
+        """Flush and unmap the ring file"""
+        with self.lock:
+            if self.mm.closed:
+                return
+            if not self.readonly:
+                self.mm.flush()
+            self.mm.close()
+            self.file.close()
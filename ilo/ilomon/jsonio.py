@@ -0,0 +1,50 @@
+"""
+JSON decoding of Redfish responses and the NDJSON output encoder
+
+orjson is used when it is installed. It pulls in datetime, uuid and zoneinfo
+on import, so local runs that only print line protocol never load this module.
+"""
+
+import json
+from typing import Dict, List
+
+from .samples import Sample
+
+# Use orjson for Redfish responses and NDJSON output when it is installed
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps_compact = lambda obj: orjson.dumps(obj, default=str).decode()
+except ImportError:
+    json_loads = json.loads
+    json_dumps_compact = lambda obj: json.dumps(obj, separators=(',', ':'), default=str)
+
+NDJSON_SCHEMA_VERSION = 1
+
+def encode_ndjson(samples: List[Sample], timestamp: int, host: str, version: str, host_tags: Dict[str, str],
+                  per_metric: bool = False) -> str:
+    """Encode samples as NDJSON.
+    
+    Every series is split into numeric "fields" and string "tags", so record
+    keys and value types stay the same from one collection to the next.
+    """
+    # The header is encoded once and shared as the prefix of every record
+    prefix = json_dumps_compact({
+        "schema": NDJSON_SCHEMA_VERSION,
+        "timestamp": timestamp,
+        "host": host,
+        "ilo_version": version,
+        "host_tags": host_tags
+    })[:-1]
+    
+    series = {}
+    for sample in samples:
+        tag_names, field_names = sample.layout
+        values = sample.values
+        series[sample.key] = {"fields": dict(zip(field_names, values[len(tag_names):])),
+                              "tags": dict(zip(tag_names, values))}
+    
+    if per_metric:
+        return "\n".join(f'{prefix},"metric":{json_dumps_compact(key)},{json_dumps_compact(data)[1:]}'
+                         for key, data in series.items())
+    return f'{prefix},"metrics":{json_dumps_compact(series)}}}'
@@ -0,0 +1,1160 @@
+"""
+Local host collection through ipmitool, lm-sensors, hpasmcli, dmidecode,
+ssacli, smartctl and sysfs
+"""
+
+import json
+import glob
+import os
+import re
+import shutil
+import subprocess
+import time
+from typing import Dict, List, Optional, Any
+
+from .logs import logging_configured
+from .samples import STATUS_NUMERIC
+
+# Smart Array fields that change between detail scans. Controller status is
+# re-read from ``show status``; the temperatures are only in the detail scan.
+SSACLI_VOLATILE_KEYS = {
+    "controllers": ("Controller Status", "Cache Status", "Battery/Capacitor Status", "Controller Temperature (C)"),
+    "physical_drives": ("Current Temperature (C)",)
+}
+
+class LocalCollector:
+    """Local host collectors, mixed into iLOMonitor"""
+    
+    def _check_local_tools(self):
+        """Check for available local monitoring tools"""
+        self.available_tools = {
+            'ipmitool': self._check_command('ipmitool'),
+            'hplog': self._check_command('hplog'),
+            'hpasmcli': self._check_command('hpasmcli'),
+            'dmidecode': self._check_command('dmidecode'),
+            'sensors': self._check_command('sensors'),
+            'smartctl': self._check_command('smartctl'),
+            'hpssacli': self._check_command('hpssacli'),
+            'ssacli': self._check_command('ssacli'),
+        }
+        
+        if logging_configured():
+            available = [tool for tool, status in self.available_tools.items() if status]
+            self.logger.info(f"Available local monitoring tools: {', '.join(available)}")
+        
+        if not any(self.available_tools.values()):
+            self.logger.warning("No hardware monitoring tools found. Install ipmitool, hpasmcli, or HP management tools.")
+    
+    def _check_command(self, command: str) -> bool:
+        """Check if a command is available on PATH (without running it)"""
+        return shutil.which(command) is not None
+    
+    def _run_command(self, command: List[str], timeout: int = 30) -> Optional[str]:
+        """Run a system command and return output"""
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+            if result.returncode == 0:
+                return result.stdout.strip()
+            else:
+                self.logger.error(f"Command failed: {' '.join(command)} - {result.stderr}")
+                return None
+        except subprocess.TimeoutExpired:
+            self.logger.error(f"Command timeout: {' '.join(command)}")
+            return None
+        except Exception as e:
+            self.logger.error(f"Command error: {' '.join(command)} - {e}")
+            return None
+    
+    def _get_local_system_health(self) -> Dict[str, Any]:
+        """Get system health from local host"""
+        metrics = {}
+        
+        # Check system uptime and load
+        try:
+            with open('/proc/uptime', 'r') as f:
+                uptime_seconds = float(f.read().split()[0])
+            
+            with open('/proc/loadavg', 'r') as f:
+                load_avg = f.read().split()[:3]
+            
+            metrics["system_health"] = {
+                "state": "Enabled",
+                "health": "OK",
+                "power_state": "On",
+                "uptime_seconds": uptime_seconds,
+                "load_1min": float(load_avg[0]),
+                "load_5min": float(load_avg[1]),
+                "load_15min": float(load_avg[2])
+            }
+        except Exception as e:
+            self.logger.error(f"Error reading system stats: {e}")
+            metrics["system_health"] = {
+                "state": "Unknown",
+                "health": "Unknown",
+                "power_state": "Unknown"
+            }
+        
+        # Use IPMI for additional health info if available
+        if self.available_tools.get('ipmitool'):
+            ipmi_health = self._get_ipmi_system_health()
+            if ipmi_health:
+                metrics["system_health"].update(ipmi_health)
+        
+        return metrics
+    
+    def _get_ipmi_system_health(self) -> Dict[str, Any]:
+        """Get system health via IPMI"""
+        health_data = {}
+        
+        # Get chassis status
+        chassis_output = self._run_command(['ipmitool', 'chassis', 'status'])
+        if chassis_output:
+            for line in chassis_output.split('\n'):
+                if 'System Power' in line:
+                    power_state = line.split(':')[1].strip()
+                    health_data['ipmi_power_state'] = power_state
+                elif 'Power Overload' in line:
+                    overload = 'true' in line.lower()
+                    health_data['power_overload'] = overload
+        
+        # Get SEL (System Event Log) summary
+        sel_output = self._run_command(['ipmitool', 'sel', 'elist', 'last', '10'])
+        if sel_output:
+            error_count = 0
+            warning_count = 0
+            for line in sel_output.split('\n'):
+                if any(word in line.lower() for word in ['error', 'fail', 'critical']):
+                    error_count += 1
+                elif any(word in line.lower() for word in ['warning', 'assert']):
+                    warning_count += 1
+            
+            health_data['recent_errors'] = error_count
+            health_data['recent_warnings'] = warning_count
+            
+            # Determine overall health based on recent events
+            if error_count > 0:
+                health_data['ipmi_health'] = 'Critical'
+            elif warning_count > 2:
+                health_data['ipmi_health'] = 'Warning'
+            else:
+                health_data['ipmi_health'] = 'OK'
+        
+        return health_data
+    
+    def _get_local_thermal_metrics(self) -> Dict[str, Any]:
+        """Get thermal metrics from local host.
+        
+        lm-sensors, IPMI, hpasmcli and sysfs frequently report the same
+        physical sensors. A source plan learned on a full run picks the
+        cheapest backend per sensor class and only those backends run until
+        the plan is re-validated after ``thermal_plan_interval`` seconds.
+        Unclassified sensors (chipset, VR, drive zones) cannot be matched
+        across backends, so every backend reporting any of them keeps running.
+        """
+        backends = {}
+        if self.available_tools.get('sensors'):
+            backends['lm_sensors'] = self._get_sensors_data
+        if self.available_tools.get('ipmitool'):
+            backends['ipmi'] = self._get_ipmi_thermal_data
+        if self.available_tools.get('hpasmcli'):
+            backends['hpasmcli'] = self._get_hp_thermal_data
+        # Read from /sys filesystem as fallback
+        backends['sysfs'] = self._get_sys_thermal_data
+        
+        if self.config.thermal_plan_interval <= 0:
+            metrics = {}
+            for collect in backends.values():
+                metrics.update(collect())
+            return metrics
+        
+        plan_file = os.path.join(self.config.cache_dir, "thermal_plan.json")
+        plan = self._load_cache_file(plan_file)
+        learning = (
+            not plan
+            or not isinstance(plan.get("classes"), dict)
+            or not isinstance(plan.get("other"), list)
+            or sorted(plan.get("backends", [])) != sorted(backends)
+            or time.time() - plan.get("timestamp", 0) >= self.config.thermal_plan_interval
+        )
+        
+        results = {}
+        costs = {}
+        for name, collect in backends.items():
+            if learning or name in plan["classes"].values() or name in plan["other"]:
+                start = time.monotonic()
+                results[name] = collect()
+                costs[name] = time.monotonic() - start
+        
+        if learning:
+            plan = self._build_thermal_plan(results, costs)
+            self.logger.info(f"Thermal source plan: {plan['classes']}, unclassified sensors from {plan['other']}")
+        
+        metrics = {}
+        covered = set()
+        other_covered = set()
+        for name, backend_metrics in results.items():
+            for key, value in backend_metrics.items():
+                sensor_class = self._classify_thermal_sensor(key)
+                if sensor_class == 'other':
+                    metrics[key] = value
+                    other_covered.add(name)
+                elif plan["classes"].get(sensor_class) == name:
+                    metrics[key] = value
+                    covered.add(sensor_class)
+        
+        if not learning and (covered != set(plan["classes"]) or other_covered != set(plan["other"])):
+            # A planned source stopped reporting a class; relearn next cycle
+            self.logger.info("Thermal source plan lost coverage, re-validating on next run")
+            plan["timestamp"] = 0
+        
+        self._save_cache_file(plan_file, plan)
+        return metrics
+    
+    def _build_thermal_plan(self, results: Dict[str, Dict[str, Any]], costs: Dict[str, float]) -> Dict[str, Any]:
+        """Choose the cheapest backend that covers each sensor class; keep every backend with unclassified sensors"""
+        classes = {}
+        other = set()
+        for name in sorted(results, key=lambda backend: costs[backend]):
+            for key in results[name]:
+                sensor_class = self._classify_thermal_sensor(key)
+                if sensor_class == 'other':
+                    other.add(name)
+                else:
+                    classes.setdefault(sensor_class, name)
+        
+        return {
+            "timestamp": int(time.time()),
+            "backends": sorted(results),
+            "classes": classes,
+            "other": sorted(other),
+            "costs": {name: round(cost, 3) for name, cost in costs.items()}
+        }
+    
+    def _classify_thermal_sensor(self, key: str) -> str:
+        """Map a thermal metric key to the physical sensor class it describes"""
+        if key.startswith('fan_'):
+            return 'fan'
+        if re.search(r'power_supply|psu|_ps\d|_ps_', key):
+            return 'psu'
+        if re.search(r'inlet|ambient|ambnt', key):
+            return 'inlet'
+        if re.search(r'cpu|proc|core|package|coretemp|k10temp|tctl|tdie|x86_pkg', key):
+            return 'cpu'
+        if re.search(r'dimm|memory|_mem_', key):
+            return 'memory'
+        return 'other'
+    
+    def _get_sensors_data(self) -> Dict[str, Any]:
+        """Get thermal data from lm-sensors"""
+        metrics = {}
+        sensors_output = self._run_command(['sensors', '-A', '-j'])
+        
+        if sensors_output:
+            try:
+                sensors_json = json.loads(sensors_output)
+                for chip_name, chip_data in sensors_json.items():
+                    if isinstance(chip_data, dict):
+                        for sensor_name, sensor_data in chip_data.items():
+                            if isinstance(sensor_data, dict):
+                                # Temperature sensors
+                                if any(key.endswith('_input') for key in sensor_data.keys()):
+                                    for key, value in sensor_data.items():
+                                        if key.endswith('_input') and isinstance(value, (int, float)):
+                                            clean_name = f"{chip_name}_{sensor_name}".replace('-', '_').replace(' ', '_').lower()
+                                            metrics[f"temperature_{clean_name}"] = {
+                                                "value": value,
+                                                "status": "OK",
+                                                "source": "lm_sensors"
+                                            }
+                                            
+                                            # Add thresholds if available
+                                            crit_key = key.replace('_input', '_crit')
+                                            max_key = key.replace('_input', '_max')
+                                            if crit_key in sensor_data:
+                                                metrics[f"temperature_{clean_name}"]["upper_threshold"] = sensor_data[crit_key]
+                                            if max_key in sensor_data:
+                                                metrics[f"temperature_{clean_name}"]["upper_threshold_warning"] = sensor_data[max_key]
+                                
+                                # Fan sensors
+                                if 'fan' in sensor_name.lower():
+                                    for key, value in sensor_data.items():
+                                        if key.endswith('_input') and isinstance(value, (int, float)):
+                                            clean_name = f"{chip_name}_{sensor_name}".replace('-', '_').replace(' ', '_').lower()
+                                            metrics[f"fan_{clean_name}"] = {
+                                                "speed_rpm": value,
+                                                "status": "OK" if value > 0 else "Warning",
+                                                "source": "lm_sensors"
+                                            }
+            except json.JSONDecodeError:
+                # Fall back to text parsing
+                self._parse_sensors_text_output(sensors_output, metrics)
+        
+        return metrics
+    
+    def _parse_sensors_text_output(self, output: str, metrics: Dict) -> None:
+        """Parse text output from sensors command"""
+        current_chip = None
+        for line in output.split('\n'):
+            line = line.strip()
+            if not line or line.startswith('Adapter:'):
+                continue
+            
+            if ':' not in line:
+                current_chip = line.replace('-', '_').replace(' ', '_').lower()
+                continue
+            
+            if current_chip and ':' in line:
+                parts = line.split(':')
+                sensor_name = parts[0].strip().replace(' ', '_').lower()
+                value_part = parts[1].strip()
+                
+                # Extract numeric value
+                temp_match = re.search(r'([+-]?\d+\.?\d*)°C', value_part)
+                rpm_match = re.search(r'(\d+)\s*RPM', value_part)
+                
+                if temp_match:
+                    temp_value = float(temp_match.group(1))
+                    metrics[f"temperature_{current_chip}_{sensor_name}"] = {
+                        "value": temp_value,
+                        "status": "OK",
+                        "source": "lm_sensors"
+                    }
+                elif rpm_match:
+                    rpm_value = int(rpm_match.group(1))
+                    metrics[f"fan_{current_chip}_{sensor_name}"] = {
+                        "speed_rpm": rpm_value,
+                        "status": "OK" if rpm_value > 0 else "Warning",
+                        "source": "lm_sensors"
+                    }
+    
+    def _get_ipmi_thermal_data(self) -> Dict[str, Any]:
+        """Get thermal data via IPMI"""
+        metrics = {}
+        
+        # Get sensor readings
+        sdr_output = self._run_command(['ipmitool', 'sdr', 'type', 'temperature'])
+        if sdr_output:
+            for line in sdr_output.split('\n'):
+                if '|' in line:
+                    parts = [p.strip() for p in line.split('|')]
+                    if len(parts) >= 3:
+                        sensor_name = parts[0].replace(' ', '_').lower()
+                        # 'sdr type' adds ID and entity columns: name | id | status | entity | reading
+                        value_str = parts[4] if len(parts) >= 5 else parts[1]
+                        status = parts[2]
+                        
+                        # Extract temperature value
+                        temp_match = re.search(r'([+-]?\d+(?:\.\d+)?)\s*degrees', value_str)
+                        if temp_match:
+                            temp_value = float(temp_match.group(1))
+                            metrics[f"temperature_ipmi_{sensor_name}"] = {
+                                "value": temp_value,
+                                "status": status,
+                                "source": "ipmi"
+                            }
+        
+        # Get fan readings
+        fan_output = self._run_command(['ipmitool', 'sdr', 'type', 'fan'])
+        if fan_output:
+            for line in fan_output.split('\n'):
+                if '|' in line:
+                    parts = [p.strip() for p in line.split('|')]
+                    if len(parts) >= 3:
+                        sensor_name = parts[0].replace(' ', '_').lower()
+                        # 'sdr type' adds ID and entity columns: name | id | status | entity | reading
+                        value_str = parts[4] if len(parts) >= 5 else parts[1]
+                        status = parts[2]
+                        
+                        # Extract RPM value
+                        rpm_match = re.search(r'(\d+)\s*RPM', value_str)
+                        if rpm_match:
+                            rpm_value = int(rpm_match.group(1))
+                            metrics[f"fan_ipmi_{sensor_name}"] = {
+                                "speed_rpm": rpm_value,
+                                "status": status,
+                                "source": "ipmi"
+                            }
+        
+        return metrics
+    
+    def _get_hp_thermal_data(self) -> Dict[str, Any]:
+        """Get thermal data from HP management tools"""
+        metrics = {}
+        
+        # Get temperature data
+        temp_output = self._run_command(['hpasmcli', '-s', 'show temp'])
+        if temp_output:
+            for line in temp_output.split('\n'):
+                if 'C/' in line and 'F' in line:
+                    # Parse HP temperature format
+                    parts = line.split()
+                    if len(parts) >= 4:
+                        sensor_name = '_'.join(parts[1:-2]).lower().replace(' ', '_')
+                        temp_match = re.search(r'(\d+)C', line)
+                        if temp_match:
+                            temp_value = int(temp_match.group(1))
+                            status = "OK" if "NORMAL" in line.upper() else "Warning"
+                            metrics[f"temperature_hp_{sensor_name}"] = {
+                                "value": temp_value,
+                                "status": status,
+                                "source": "hpasmcli"
+                            }
+        
+        # Get fan data
+        fan_output = self._run_command(['hpasmcli', '-s', 'show fans'])
+        if fan_output:
+            for line in fan_output.split('\n'):
+                if '%' in line and ('Fan' in line or 'fan' in line):
+                    parts = line.split()
+                    if len(parts) >= 4:
+                        fan_name = '_'.join(parts[1:-2]).lower().replace(' ', '_')
+                        percent_match = re.search(r'(\d+)%', line)
+                        if percent_match:
+                            percent_value = int(percent_match.group(1))
+                            status = "OK" if "NORMAL" in line.upper() else "Warning"
+                            metrics[f"fan_hp_{fan_name}"] = {
+                                "speed_percent": percent_value,
+                                "status": status,
+                                "source": "hpasmcli"
+                            }
+        
+        return metrics
+    
+    def _get_sys_thermal_data(self) -> Dict[str, Any]:
+        """Get thermal data from /sys filesystem"""
+        metrics = {}
+        
+        # Read thermal zones
+        thermal_zones = glob.glob('/sys/class/thermal/thermal_zone*/temp')
+        for zone_file in thermal_zones:
+            try:
+                with open(zone_file, 'r') as f:
+                    temp_millicelsius = int(f.read().strip())
+                    temp_celsius = temp_millicelsius / 1000.0
+                
+                zone_name = os.path.basename(os.path.dirname(zone_file))
+                
+                # Try to get the thermal zone type
+                type_file = os.path.join(os.path.dirname(zone_file), 'type')
+                zone_type = "unknown"
+                try:
+                    with open(type_file, 'r') as f:
+                        zone_type = f.read().strip().replace('-', '_').replace(' ', '_')
+                except:
+                    pass
+                
+                metrics[f"temperature_sys_{zone_type}_{zone_name}"] = {
+                    "value": temp_celsius,
+                    "status": "OK",
+                    "source": "sysfs"
+                }
+            except (ValueError, IOError):
+                continue
+        
+        # Read hwmon sensors
+        hwmon_dirs = glob.glob('/sys/class/hwmon/hwmon*/temp*_input')
+        for temp_file in hwmon_dirs:
+            try:
+                with open(temp_file, 'r') as f:
+                    temp_millicelsius = int(f.read().strip())
+                    temp_celsius = temp_millicelsius / 1000.0
+                
+                # Get sensor name
+                hwmon_dir = os.path.dirname(temp_file)
+                sensor_id = os.path.basename(temp_file).replace('_input', '')
+                
+                # Try to get a descriptive name
+                name_file = os.path.join(hwmon_dir, 'name')
+                hwmon_name = "hwmon"
+                try:
+                    with open(name_file, 'r') as f:
+                        hwmon_name = f.read().strip().replace('-', '_').replace(' ', '_')
+                except:
+                    pass
+                
+                metrics[f"temperature_hwmon_{hwmon_name}_{sensor_id}"] = {
+                    "value": temp_celsius,
+                    "status": "OK",
+                    "source": "hwmon"
+                }
+            except (ValueError, IOError):
+                continue
+        
+        return metrics
+    
+    def _get_local_power_metrics(self) -> Dict[str, Any]:
+        """Get power metrics from local host"""
+        metrics = {}
+        
+        # Try IPMI power monitoring
+        if self.available_tools.get('ipmitool'):
+            ipmi_power = self._get_ipmi_power_data()
+            metrics.update(ipmi_power)
+        
+        # Try HP management tools
+        if self.available_tools.get('hpasmcli'):
+            hp_power = self._get_hp_power_data()
+            metrics.update(hp_power)
+        
+        # Read from ACPI/sysfs
+        sys_power = self._get_sys_power_data()
+        metrics.update(sys_power)
+        
+        return metrics
+    
+    def _get_ipmi_power_data(self) -> Dict[str, Any]:
+        """Get power data via IPMI"""
+        metrics = {}
+        
+        # Get power supply status
+        psu_output = self._run_command(['ipmitool', 'sdr', 'type', 'Power Supply'])
+        if psu_output:
+            psu_count = 0
+            for line in psu_output.split('\n'):
+                if '|' in line:
+                    parts = [p.strip() for p in line.split('|')]
+                    if len(parts) >= 3:
+                        psu_count += 1
+                        psu_name = parts[0].replace(' ', '_').lower()
+                        status = parts[2]
+                        
+                        metrics[f"power_supply_ipmi_{psu_count}"] = {
+                            "status": status,
+                            "name": psu_name,
+                            "source": "ipmi"
+                        }
+        
+        # Try to get power consumption if supported
+        power_output = self._run_command(['ipmitool', 'dcmi', 'power', 'reading'])
+        if power_output:
+            for line in power_output.split('\n'):
+                if 'Current Power' in line:
+                    power_match = re.search(r'(\d+)\s*Watts', line)
+                    if power_match:
+                        current_power = int(power_match.group(1))
+                        metrics["power_consumption"] = {
+                            "current_watts": current_power,
+                            "source": "ipmi_dcmi"
+                        }
+                elif 'Average Power' in line:
+                    avg_match = re.search(r'(\d+)\s*Watts', line)
+                    if avg_match and "power_consumption" in metrics:
+                        metrics["power_consumption"]["average_watts"] = int(avg_match.group(1))
+                elif 'Max Power' in line:
+                    max_match = re.search(r'(\d+)\s*Watts', line)
+                    if max_match and "power_consumption" in metrics:
+                        metrics["power_consumption"]["max_watts"] = int(max_match.group(1))
+        
+        return metrics
+    
+    def _get_hp_power_data(self) -> Dict[str, Any]:
+        """Get power data from HP management tools"""
+        metrics = {}
+        
+        # Get power supply status
+        psu_output = self._run_command(['hpasmcli', '-s', 'show powersupply'])
+        if psu_output:
+            psu_count = 0
+            for line in psu_output.split('\n'):
+                if 'Power supply' in line:
+                    psu_count += 1
+                    status = "OK" if "Yes" in line else "Warning"
+                    metrics[f"power_supply_hp_{psu_count}"] = {
+                        "status": status,
+                        "source": "hpasmcli"
+                    }
+        
+        return metrics
+    
+    def _get_sys_power_data(self) -> Dict[str, Any]:
+        """Get power data from /sys filesystem"""
+        metrics = {}
+        
+        # Try to read from power_supply class
+        power_supplies = glob.glob('/sys/class/power_supply/*/type')
+        for ps_type_file in power_supplies:
+            try:
+                with open(ps_type_file, 'r') as f:
+                    ps_type = f.read().strip()
+                
+                if ps_type in ['Mains', 'UPS']:  # AC power supplies
+                    ps_dir = os.path.dirname(ps_type_file)
+                    ps_name = os.path.basename(ps_dir)
+                    
+                    # Read status
+                    status_file = os.path.join(ps_dir, 'online')
+                    if os.path.exists(status_file):
+                        with open(status_file, 'r') as f:
+                            online = f.read().strip() == '1'
+                        
+                        metrics[f"power_supply_sys_{ps_name}"] = {
+                            "status": "OK" if online else "Critical",
+                            "online": online,
+                            "type": ps_type,
+                            "source": "sysfs"
+                        }
+            except (IOError, ValueError):
+                continue
+        
+        # Try Intel RAPL (Running Average Power Limit) for power consumption
+        rapl_files = glob.glob('/sys/class/powercap/intel-rapl*/energy_uj')
+        if rapl_files:
+            total_energy = 0
+            rapl_count = 0
+            for rapl_file in rapl_files:
+                try:
+                    with open(rapl_file, 'r') as f:
+                        energy_uj = int(f.read().strip())
+                        total_energy += energy_uj
+                        rapl_count += 1
+                except (IOError, ValueError):
+                    continue
+            
+            if rapl_count > 0:
+                # Note: This is energy, not power. Need time difference for power calculation
+                metrics["energy_consumption"] = {
+                    "total_energy_uj": total_energy,
+                    "rapl_domains": rapl_count,
+                    "source": "intel_rapl"
+                }
+        
+        return metrics
+    
+    def _get_local_memory_metrics(self) -> Dict[str, Any]:
+        """Get memory metrics from local host"""
+        metrics = {}
+        
+        # Try dmidecode for detailed memory info
+        if self.available_tools.get('dmidecode'):
+            dmi_memory = self._get_dmidecode_memory()
+            metrics.update(dmi_memory)
+        
+        # Get memory usage from /proc/meminfo
+        sys_memory = self._get_sys_memory_info()
+        metrics.update(sys_memory)
+        
+        # Try IPMI memory monitoring
+        if self.available_tools.get('ipmitool'):
+            ipmi_memory = self._get_ipmi_memory_data()
+            metrics.update(ipmi_memory)
+        
+        return metrics
+    
+    def _get_dmidecode_memory(self) -> Dict[str, Any]:
+        """Get memory information from dmidecode"""
+        metrics = {}
+        
+        # Get memory device information
+        dmi_output = self._run_command(['dmidecode', '-t', 'memory'])
+        if dmi_output:
+            current_dimm = None
+            for line in dmi_output.split('\n'):
+                line = line.strip()
+                
+                if line.startswith('Memory Device'):
+                    current_dimm = {}
+                elif current_dimm is not None:
+                    if line.startswith('Locator:'):
+                        locator = line.split(':', 1)[1].strip()
+                        current_dimm['locator'] = locator
+                    elif line.startswith('Size:'):
+                        size_str = line.split(':', 1)[1].strip()
+                        if 'MB' in size_str:
+                            size_match = re.search(r'(\d+)\s*MB', size_str)
+                            if size_match:
+                                current_dimm['size_mb'] = int(size_match.group(1))
+                        elif 'GB' in size_str:
+                            size_match = re.search(r'(\d+)\s*GB', size_str)
+                            if size_match:
+                                current_dimm['size_mb'] = int(size_match.group(1)) * 1024
+                    elif line.startswith('Speed:'):
+                        speed_str = line.split(':', 1)[1].strip()
+                        speed_match = re.search(r'(\d+)\s*MT/s', speed_str)
+                        if speed_match:
+                            current_dimm['speed_mhz'] = int(speed_match.group(1))
+                    elif line.startswith('Manufacturer:'):
+                        manufacturer = line.split(':', 1)[1].strip()
+                        current_dimm['manufacturer'] = manufacturer
+                    elif line.startswith('Type:'):
+                        mem_type = line.split(':', 1)[1].strip()
+                        current_dimm['type'] = mem_type
+                    elif line == '' and current_dimm and 'locator' in current_dimm:
+                        # End of memory device section
+                        if current_dimm.get('size_mb', 0) > 0:  # Only include populated slots
+                            locator = current_dimm['locator'].replace(' ', '_').lower()
+                            metrics[f"memory_dimm_{locator}"] = {
+                                "status": "OK",  # dmidecode doesn't provide health status
+                                "size_mb": current_dimm.get('size_mb', 0),
+                                "speed_mhz": current_dimm.get('speed_mhz', 0),
+                                "manufacturer": current_dimm.get('manufacturer', "Unknown"),
+                                "type": current_dimm.get('type', "Unknown"),
+                                "source": "dmidecode"
+                            }
+                        current_dimm = None
+        
+        return metrics
+    
+    def _get_sys_memory_info(self) -> Dict[str, Any]:
+        """Get memory usage information from /proc/meminfo"""
+        metrics = {}
+        
+        try:
+            with open('/proc/meminfo', 'r') as f:
+                meminfo = f.read()
+            
+            memory_stats = {}
+            for line in meminfo.split('\n'):
+                if ':' in line:
+                    key, value = line.split(':', 1)
+                    key = key.strip()
+                    value = value.strip()
+                    
+                    # Extract numeric value (usually in kB)
+                    value_match = re.search(r'(\d+)', value)
+                    if value_match:
+                        memory_stats[key] = int(value_match.group(1))
+            
+            if memory_stats:
+                total_kb = memory_stats.get('MemTotal', 0)
+                free_kb = memory_stats.get('MemFree', 0)
+                available_kb = memory_stats.get('MemAvailable', free_kb)
+                buffers_kb = memory_stats.get('Buffers', 0)
+                cached_kb = memory_stats.get('Cached', 0)
+                
+                used_kb = total_kb - available_kb
+                
+                metrics["memory_usage"] = {
+                    "total_mb": total_kb // 1024,
+                    "used_mb": used_kb // 1024,
+                    "free_mb": free_kb // 1024,
+                    "available_mb": available_kb // 1024,
+                    "buffers_mb": buffers_kb // 1024,
+                    "cached_mb": cached_kb // 1024,
+                    "usage_percent": (used_kb / total_kb * 100) if total_kb > 0 else 0,
+                    "source": "proc_meminfo"
+                }
+        except IOError:
+            pass
+        
+        return metrics
+    
+    def _get_ipmi_memory_data(self) -> Dict[str, Any]:
+        """Get memory error information via IPMI"""
+        metrics = {}
+        
+        # Check for memory-related SEL entries
+        sel_output = self._run_command(['ipmitool', 'sel', 'elist'])
+        if sel_output:
+            memory_errors = 0
+            memory_warnings = 0
+            
+            for line in sel_output.split('\n'):
+                if any(term in line.lower() for term in ['memory', 'dimm', 'ecc']):
+                    if any(term in line.lower() for term in ['error', 'fail', 'critical']):
+                        memory_errors += 1
+                    elif any(term in line.lower() for term in ['warning', 'correctable']):
+                        memory_warnings += 1
+            
+            if memory_errors > 0 or memory_warnings > 0:
+                metrics["memory_health"] = {
+                    "error_count": memory_errors,
+                    "warning_count": memory_warnings,
+                    "status": "Critical" if memory_errors > 0 else "Warning" if memory_warnings > 0 else "OK",
+                    "source": "ipmi_sel"
+                }
+        
+        return metrics
+    
+    def _get_local_storage_metrics(self) -> Dict[str, Any]:
+        """Get storage metrics from local host"""
+        metrics = {}
+        
+        # HP Smart Array controllers via ssacli (or the older hpssacli)
+        if self.available_tools.get('ssacli') or self.available_tools.get('hpssacli'):
+            ssacli_data = self._get_ssacli_storage_data()
+            metrics.update(ssacli_data)
+        
+        # Per-disk SMART health
+        if self.available_tools.get('smartctl'):
+            smart_data = self._get_smartctl_data()
+            metrics.update(smart_data)
+        
+        return metrics
+    
+    def _get_ssacli_storage_data(self) -> Dict[str, Any]:
+        """Get Smart Array controller, array, logical and physical drive state.
+        
+        The full ``show config detail`` scan is slow (5-20s), so its parsed
+        topology is cached on disk and only refreshed every
+        ``storage_detail_interval`` seconds. In between, the much cheaper
+        ``show config`` summary supplies the current logical and physical
+        drive status and ``show status`` the controller, cache and battery
+        status. Temperatures and array status are only read by the detail
+        scan, so they are left out in between rather than replayed. A drive
+        appearing or disappearing forces a rescan.
+        """
+        ssacli = 'ssacli' if self.available_tools.get('ssacli') else 'hpssacli'
+        cache_file = os.path.join(self.config.cache_dir, f"{ssacli}_topology.json")
+        
+        topology = None
+        cache = self._load_cache_file(cache_file)
+        if cache and time.time() - cache.get("timestamp", 0) < self.config.storage_detail_interval:
+            summary_output = self._run_command([ssacli, 'ctrl', 'all', 'show', 'config'], timeout=60)
+            if summary_output:
+                statuses = self._parse_ssacli_summary(summary_output)
+                cached = cache.get("topology", {})
+                known = set()
+                for section in ("logical_drives", "physical_drives"):
+                    known.update(cached.get(section, {}).keys())
+                if known == set(statuses.keys()):
+                    # Array status is not in the summary; leave the arrays out until the next detail scan
+                    topology = dict(cached, arrays={})
+                    for section in ("logical_drives", "physical_drives"):
+                        for component_id, component in topology.get(section, {}).items():
+                            component["Status"] = statuses[component_id]
+                    for section, keys in SSACLI_VOLATILE_KEYS.items():
+                        for component in topology.get(section, {}).values():
+                            for key in keys:
+                                component.pop(key, None)
+                    status_output = self._run_command([ssacli, 'ctrl', 'all', 'show', 'status'], timeout=60)
+                    for slot, controller_status in self._parse_ssacli_status(status_output or "").items():
+                        if slot in topology.get("controllers", {}):
+                            topology["controllers"][slot].update(controller_status)
+                else:
+                    self.logger.info("Smart Array configuration changed, refreshing topology")
+        
+        if topology is None:
+            detail_output = self._run_command([ssacli, 'ctrl', 'all', 'show', 'config', 'detail'], timeout=120)
+            if not detail_output:
+                return {}
+            topology = self._parse_ssacli_detail(detail_output)
+            self._save_cache_file(cache_file, {"timestamp": int(time.time()), "topology": topology})
+        
+        return self._ssacli_topology_to_metrics(topology)
+    
+    def _parse_ssacli_detail(self, output: str) -> Dict[str, Dict[str, Dict[str, str]]]:
+        """Parse ``ssacli ctrl all show config detail`` in a single pass"""
+        topology = {"controllers": {}, "arrays": {}, "logical_drives": {}, "physical_drives": {}}
+        
+        # Stack of (indent, attributes) for the sections enclosing the current
+        # line. Unrecognised sections (drive cages, ports, expanders) are
+        # pushed with attributes None so their properties are discarded.
+        stack = []
+        slot = None
+        array = None
+        
+        for raw_line in output.split('\n'):
+            line = raw_line.strip()
+            if not line:
+                continue
+            indent = len(raw_line) - len(raw_line.lstrip())
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            
+            controller_match = re.match(r'(.+?) in Slot (\S+)', line) if indent == 0 else None
+            array_match = re.match(r'Array:?\s+(\S+)$', line)
+            logical_match = re.match(r'Logical Drive:?\s+(\d+)$', line)
+            physical_match = re.match(r'physicaldrive\s+(\S+)$', line, re.IGNORECASE)
+            
+            if controller_match:
+                slot = controller_match.group(2).lower()
+                array = None
+                section = {"Model": controller_match.group(1)}
+                topology["controllers"][slot] = section
+            elif slot is None:
+                continue
+            elif array_match:
+                array = array_match.group(1)
+                section = {}
+                topology["arrays"][f"{slot}_{array}"] = section
+            elif logical_match:
+                section = {"Array": array or ""}
+                topology["logical_drives"][f"{slot}_{logical_match.group(1)}"] = section
+            elif physical_match:
+                section = {"Array": array or ""}
+                drive_id = physical_match.group(1).replace(':', '_').lower()
+                topology["physical_drives"][f"{slot}_{drive_id}"] = section
+            elif line.lower() == 'unassigned':
+                array = None
+                section = None
+            elif ': ' in line or line.endswith(':'):
+                key, value = line.split(':', 1)
+                parent = stack[-1][1] if stack else None
+                if parent is not None:
+                    parent[key.strip()] = value.strip()
+                continue
+            else:
+                section = None
+            
+            stack.append((indent, section))
+        
+        return topology
+    
+    def _parse_ssacli_status(self, output: str) -> Dict[str, Dict[str, str]]:
+        """Parse controller, cache and battery status from ``ssacli ctrl all show status``"""
+        statuses = {}
+        slot = None
+        
+        for line in output.split('\n'):
+            controller_match = re.match(r'(\S.*?) in Slot (\S+)', line)
+            if controller_match:
+                slot = controller_match.group(2).lower()
+                statuses[slot] = {}
+                continue
+            if slot is None or ':' not in line:
+                continue
+            key, value = (part.strip() for part in line.split(':', 1))
+            if key in SSACLI_VOLATILE_KEYS["controllers"]:
+                statuses[slot][key] = value
+        
+        return statuses
+    
+    def _parse_ssacli_summary(self, output: str) -> Dict[str, str]:
+        """Parse component status from ``ssacli ctrl all show config``"""
+        statuses = {}
+        slot = None
+        
+        for line in output.split('\n'):
+            controller_match = re.match(r'(\S.*?) in Slot (\S+)', line)
+            if controller_match:
+                slot = controller_match.group(2).lower()
+                continue
+            if slot is None:
+                continue
+            
+            line = line.strip()
+            logical_match = re.match(r'logicaldrive\s+(\d+)\s+\((.*)\)$', line)
+            physical_match = re.match(r'physicaldrive\s+(\S+)\s+\((.*)\)$', line)
+            if logical_match:
+                parts = [p.strip() for p in logical_match.group(2).split(',')]
+                if len(parts) >= 3:
+                    statuses[f"{slot}_{logical_match.group(1)}"] = parts[2]
+            elif physical_match:
+                parts = [p.strip() for p in physical_match.group(2).split(',')]
+                if len(parts) >= 4:
+                    drive_id = physical_match.group(1).replace(':', '_').lower()
+                    statuses[f"{slot}_{drive_id}"] = parts[3]
+        
+        return statuses
+    
+    def _ssacli_topology_to_metrics(self, topology: Dict[str, Dict[str, Dict[str, str]]]) -> Dict[str, Any]:
+        """Convert a parsed Smart Array topology into metrics"""
+        metrics = {}
+        
+        for slot, ctrl in topology.get("controllers", {}).items():
+            cache_status = ctrl.get("Cache Status", "Unknown")
+            battery_status = ctrl.get("Battery/Capacitor Status", "Unknown")
+            metrics[f"storage_controller_slot_{slot}"] = {
+                "status": ctrl.get("Controller Status", "Unknown"),
+                "cache_status": cache_status,
+                "cache_status_numeric": STATUS_NUMERIC.get(cache_status, 0),
+                "battery_status": battery_status,
+                "battery_status_numeric": STATUS_NUMERIC.get(battery_status, 0),
+                "model": ctrl.get("Model", "Unknown"),
+                "firmware": ctrl.get("Firmware Version", "Unknown"),
+                "source": "ssacli"
+            }
+            if "Controller Temperature (C)" in ctrl:
+                metrics[f"storage_controller_slot_{slot}"]["temperature_celsius"] = \
+                    self._parse_int(ctrl["Controller Temperature (C)"])
+        
+        for array_id, array in topology.get("arrays", {}).items():
+            metrics[f"storage_array_{array_id.lower()}"] = {
+                "status": array.get("Status", "Unknown"),
+                "interface": array.get("Interface Type", "Unknown"),
+                "source": "ssacli"
+            }
+        
+        for ld_id, ld in topology.get("logical_drives", {}).items():
+            metrics[f"storage_logical_drive_{ld_id}"] = {
+                "status": ld.get("Status", "Unknown"),
+                "capacity_gb": self._parse_ssacli_size(ld.get("Size", "")),
+                "raid_level": ld.get("Fault Tolerance", "Unknown"),
+                "array": ld.get("Array", ""),
+                "source": "ssacli"
+            }
+        
+        for pd_id, pd in topology.get("physical_drives", {}).items():
+            metrics[f"drive_{pd_id}"] = {
+                "status": pd.get("Status", "Unknown"),
+                "capacity_gb": self._parse_ssacli_size(pd.get("Size", "")),
+                "protocol": pd.get("Interface Type", "Unknown"),
+                "media_type": "SSD" if "Solid State" in pd.get("Interface Type", "") else "HDD",
+                "model": " ".join(pd.get("Model", "Unknown").split()),
+                "serial": pd.get("Serial Number", "Unknown"),
+                "array": pd.get("Array", ""),
+                "source": "ssacli"
+            }
+            if "Current Temperature (C)" in pd:
+                metrics[f"drive_{pd_id}"]["temperature_celsius"] = self._parse_int(pd["Current Temperature (C)"])
+        
+        return metrics
+    
+    def _get_smartctl_data(self) -> Dict[str, Any]:
+        """Get per-disk SMART health via smartctl.
+        
+        Devices are enumerated with ``smartctl --scan`` only every
+        ``storage_detail_interval`` seconds and identity data (model, serial,
+        capacity) is cached indefinitely.
+        Volatile attributes are re-read every ``smart_attribute_interval``
+        seconds, querying stale devices in a bounded worker pool so large
+        JBODs finish within the Telegraf timeout. A device that cannot be
+        read loses its cached attributes and is reported Critical until a
+        later query succeeds.
+        """
+        cache_file = os.path.join(self.config.cache_dir, "smartctl_state.json")
+        state = self._load_cache_file(cache_file) or {}
+        devices = state.get("devices", {})
+        now = time.time()
+        
+        if now - state.get("scan_timestamp", 0) >= self.config.storage_detail_interval:
+            scan_output = self._run_command(['smartctl', '--scan', '-j'])
+            if scan_output:
+                try:
+                    scanned = json.loads(scan_output).get("devices", [])
+                except ValueError:
+                    scanned = []
+                scanned_devices = {}
+                for dev in scanned:
+                    if not dev.get("name"):
+                        continue
+                    key = self._smart_device_key(dev["name"], dev.get("type", ""))
+                    scanned_devices[key] = devices.get(key, {"name": dev["name"], "type": dev.get("type", "")})
+                devices = scanned_devices
+                state["scan_timestamp"] = int(now)
+        
+        stale = [key for key, dev in devices.items()
+                 if now - dev.get("attributes_timestamp", 0) >= self.config.smart_attribute_interval]
+        if stale:
+            # Only needed when SMART attributes are due
+            from concurrent.futures import ThreadPoolExecutor
+            workers = max(1, min(self.config.smart_max_workers, len(stale)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(lambda key: self._query_smart_device(devices[key]), stale)
+                for key, result in zip(stale, results):
+                    if result is None:
+                        # An unresponsive drive is often a failing one; don't replay its last good reading
+                        result = {"attributes": {"status": "Critical", "query_failed": 1}}
+                    devices[key].update(result)
+                    devices[key]["attributes_timestamp"] = int(now)
+        
+        state["devices"] = devices
+        self._save_cache_file(cache_file, state)
+        
+        metrics = {}
+        for key, dev in devices.items():
+            if "attributes" not in dev:
+                continue
+            metrics[f"drive_smart_{key}"] = dict(dev.get("identity", {}), **dev["attributes"], source="smartctl")
+        
+        return metrics
+    
+    def _smart_device_key(self, name: str, dev_type: str) -> str:
+        """Build a metric-safe key for a smartctl device and type"""
+        key = os.path.basename(name)
+        # Devices behind RAID controllers share a node and differ by type (e.g. megaraid,0)
+        if ',' in dev_type:
+            key = f"{key}_{dev_type}"
+        return re.sub(r'[^a-z0-9]+', '_', key.lower())
+    
+    def _query_smart_device(self, device: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Run smartctl against one device, adding identity data on first contact"""
+        command = ['smartctl', '-j', '-A', '-H']
+        need_identity = "identity" not in device
+        if need_identity:
+            command.append('-i')
+        if device.get("type"):
+            command.extend(['-d', device["type"]])
+        command.append(device["name"])
+        
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=30)
+            data = json.loads(result.stdout)
+        except (subprocess.TimeoutExpired, OSError, ValueError) as e:
+            self.logger.error(f"smartctl error for {device['name']}: {e}")
+            return None
+        
+        # smartctl exit status is a bit mask; bits 0-1 mean the device could not be read
+        if result.returncode & 0x03:
+            self.logger.error(f"smartctl failed for {device['name']} (exit status {result.returncode})")
+            return None
+        
+        update = {"attributes": self._parse_smart_attributes(data)}
+        if need_identity:
+            update["identity"] = self._parse_smart_identity(data)
+        
+        return update
+    
+    def _parse_smart_identity(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract static identity fields from smartctl JSON"""
+        device = data.get("device", {})
+        rotation_rate = data.get("rotation_rate")
+        if rotation_rate is None:
+            media_type = "SSD" if device.get("protocol") == "NVMe" else "Unknown"
+        else:
+            media_type = "SSD" if rotation_rate == 0 else "HDD"
+        
+        return {
+            "model": data.get("model_name") or data.get("scsi_model_name") or "Unknown",
+            "serial": data.get("serial_number", "Unknown"),
+            "firmware": data.get("firmware_version") or data.get("scsi_revision") or "Unknown",
+            "capacity_gb": data.get("user_capacity", {}).get("bytes", 0) // (1024**3),
+            "protocol": device.get("protocol", "Unknown"),
+            "media_type": media_type
+        }
+    
+    def _parse_smart_attributes(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract volatile health fields from smartctl JSON (ATA, NVMe and SCSI)"""
+        attributes = {
+            "temperature_celsius": data.get("temperature", {}).get("current", 0),
+            "power_on_hours": data.get("power_on_time", {}).get("hours", 0)
+        }
+        
+        # ATA attribute table, keyed by SMART attribute ID
+        ata_ids = {
+            5: "reallocated_sectors",
+            197: "pending_sectors",
+            198: "offline_uncorrectable",
+            177: "wear_leveling_count",
+            233: "media_wearout_indicator"
+        }
+        for attr in data.get("ata_smart_attributes", {}).get("table", []):
+            field = ata_ids.get(attr.get("id"))
+            if field in ("wear_leveling_count", "media_wearout_indicator"):
+                # Normalised value counts down from 100 as the flash wears
+                attributes["wear_percent_used"] = 100 - attr.get("value", 100)
+            elif field:
+                attributes[field] = attr.get("raw", {}).get("value", 0)
+        
+        nvme_log = data.get("nvme_smart_health_information_log")
+        if nvme_log:
+            attributes["wear_percent_used"] = nvme_log.get("percentage_used", 0)
+            attributes["media_errors"] = nvme_log.get("media_errors", 0)
+            attributes["available_spare_percent"] = nvme_log.get("available_spare", 0)
+            attributes["critical_warning"] = nvme_log.get("critical_warning", 0)
+        
+        if "scsi_grown_defect_list" in data:
+            attributes["reallocated_sectors"] = data["scsi_grown_defect_list"]
+        
+        if not data.get("smart_status", {}).get("passed", True):
+            attributes["status"] = "Critical"
+        elif (attributes.get("reallocated_sectors", 0) > 0 or attributes.get("pending_sectors", 0) > 0
+              or attributes.get("critical_warning", 0) > 0):
+            attributes["status"] = "Warning"
+        else:
+            attributes["status"] = "OK"
+        
+        return attributes
+    
+    def _parse_ssacli_size(self, size_str: str) -> float:
+        """Convert an ssacli size such as '279.4 GB' or '1.2 TB' to GB"""
+        size_match = re.search(r'([\d.]+)\s*(MB|GB|TB)', size_str)
+        if not size_match:
+            return 0
+        multiplier = {"MB": 1 / 1024, "GB": 1, "TB": 1024}[size_match.group(2)]
+        return round(float(size_match.group(1)) * multiplier, 1)
+    
+    def _parse_int(self, value: Optional[str]) -> int:
+        """Parse a leading integer from a tool output value, defaulting to 0"""
+        value_match = re.match(r'\s*(-?\d+)', value or '')
+        return int(value_match.group(1)) if value_match else 0
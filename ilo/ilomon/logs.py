@@ -0,0 +1,32 @@
+"""
+Logging setup for the iLO monitor
+
+Importing and configuring ``logging`` costs more than a quiet ``--local``
+exec run spends collecting, so the collectors only set it up when they
+have something to log. The long-running modes configure it up front.
+"""
+
+_configured = False
+
+def setup_logging(debug: bool = False) -> None:
+    """Log to stderr at INFO, or DEBUG with --debug"""
+    global _configured
+    import logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    if debug:
+        logging.getLogger().setLevel(logging.DEBUG)
+    _configured = True
+
+def logging_configured() -> bool:
+    """True once logging is set up; informational messages are skipped before that"""
+    return _configured
+
+def get_logger(name: str):
+    """Logger for a module, setting up logging on first use"""
+    if not _configured:
+        setup_logging()
+    import logging
+    return logging.getLogger(name)
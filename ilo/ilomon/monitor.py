@@ -0,0 +1,248 @@
+"""
+iLOMonitor: one monitored host, local or remote, and its output encoders
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Optional, Any, TYPE_CHECKING
+
+from .config import iLOConfig
+from .local import LocalCollector
+from .logs import get_logger, logging_configured
+from .redfish import RedfishCollector
+from .samples import HEADER_KEYS, Sample, escape_tag, samples_from_metrics
+
+if TYPE_CHECKING:
+    from .delta import DeltaTracker
+    from .rollup import RollupAggregator
+
+class iLOMonitor(LocalCollector, RedfishCollector):
+    """HP iLO Hardware Monitor"""
+    
+    def __init__(self, config: iLOConfig):
+        self.config = config
+        self.local_mode = config.local_mode
+        self.sampler = None  # WindowSampler attached in daemon mode
+        self.history = None  # HistoryRing attached with --history-seconds
+        self.critical_series = set()
+        self.last_history_dump = 0
+        self.set_tags(config.tags)
+        
+        if not self.local_mode:
+            # Remote iLO monitoring setup
+            self._connect()
+        else:
+            # Local monitoring setup
+            if logging_configured():
+                self.logger.info("Running in local mode - monitoring physical host directly")
+            self._check_local_tools()
+    
+    @property
+    def logger(self):
+        # Looked up on use so a run that logs nothing never imports logging
+        return get_logger(__name__)
+    
+    def set_tags(self, tags: Dict[str, str]) -> None:
+        """Set the per-host tags and pre-encode them for line protocol output"""
+        self.config.tags = tags
+        # Encoded once here instead of for every output line
+        self.tag_str = "".join(
+            f",{escape_tag(str(key))}={escape_tag(str(value))}"
+            for key, value in sorted(tags.items())
+            if key not in ("host", "ilo_version") and value not in ("", None)
+        )
+        self.base_tags = f"host={self.config.hostname},ilo_version={self.config.version}{self.tag_str}"
+        self.base_labels = None  # remote_write labels, built on first use
+    
+    def close(self) -> None:
+        """Stop background sampling, close the history ring and release the HTTP connection pool"""
+        if self.sampler:
+            self.sampler.stop()
+            self.sampler = None
+        if self.history:
+            self.history.close()
+            self.history = None
+        if not self.local_mode:
+            self.transport.close()
+    
+    def get_system_health(self) -> Dict[str, Any]:
+        """Get overall system health status"""
+        if self.local_mode:
+            return self._get_local_system_health()
+        return self._get_redfish_system_health()
+    
+    def get_thermal_metrics(self) -> Dict[str, Any]:
+        """Get temperature and fan metrics"""
+        if self.local_mode:
+            return self._get_local_thermal_metrics()
+        return self._get_redfish_thermal_metrics()
+    
+    def get_power_metrics(self) -> Dict[str, Any]:
+        """Get power supply and consumption metrics"""
+        if self.local_mode:
+            return self._get_local_power_metrics()
+        return self._get_redfish_power_metrics()
+    
+    def get_memory_metrics(self) -> Dict[str, Any]:
+        """Get memory module status"""
+        if self.local_mode:
+            return self._get_local_memory_metrics()
+        return self._get_redfish_memory_metrics()
+    
+    def get_storage_metrics(self) -> Dict[str, Any]:
+        """Get storage device status"""
+        if self.local_mode:
+            return self._get_local_storage_metrics()
+        return self._get_redfish_storage_metrics()
+    
+    def _load_cache_file(self, path: str) -> Optional[Dict[str, Any]]:
+        """Load a JSON state file written by a previous run"""
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+    
+    def _save_cache_file(self, path: str, data: Dict[str, Any]) -> None:
+        """Atomically write a JSON state file for the next run"""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except (IOError, OSError) as e:
+            self.logger.warning(f"Could not write cache file {path}: {e}")
+    
+    
+    def collect_all_metrics(self) -> Dict[str, Any]:
+        """Collect all hardware metrics"""
+        all_metrics = {
+            "timestamp": int(time.time()),
+            "ilo_host": self.config.hostname,
+            "ilo_version": self.config.version
+        }
+        
+        if not self.local_mode:
+            self.discovery_attempted = False
+        
+        # Collect different metric types
+        try:
+            all_metrics.update(self.get_system_health())
+            all_metrics.update(self.get_thermal_metrics())
+            all_metrics.update(self.get_power_metrics())
+            all_metrics.update(self.get_memory_metrics())
+            all_metrics.update(self.get_storage_metrics())
+        except Exception as e:
+            self.logger.error(f"Error collecting metrics: {e}")
+            all_metrics["collection_error"] = str(e)
+        
+        # Merge high-frequency window statistics into the matching series
+        if self.sampler:
+            from .sampler import STANDALONE_SERIES
+            for key, window in self.sampler.drain().items():
+                existing = all_metrics.get(key)
+                if isinstance(existing, dict):
+                    existing.update({k: v for k, v in window.items() if k != "source"})
+                elif key in STANDALONE_SERIES:
+                    all_metrics[key] = window
+        
+        if self.history:
+            self._dump_history_on_critical(all_metrics)
+        
+        return all_metrics
+    
+    def _dump_history_on_critical(self, metrics: Dict[str, Any]) -> None:
+        """Dump the history ring when a series newly reports Critical status or health"""
+        from .history import DUMP_MIN_INTERVAL
+        critical = {
+            key for key, value in metrics.items()
+            if isinstance(value, dict) and "Critical" in (value.get("status"), value.get("health"))
+        }
+        new_critical = sorted(critical - self.critical_series)
+        self.critical_series = critical
+        if not new_critical or time.time() - self.last_history_dump < DUMP_MIN_INTERVAL:
+            return
+        self.last_history_dump = time.time()
+        dump_dir = os.path.join(self.config.cache_dir, "history", "dumps")
+        try:
+            path = self.history.dump(dump_dir, new_critical[0])
+        except (IOError, OSError) as e:
+            self.logger.error(f"Could not dump history for {self.config.hostname}: {e}")
+            return
+        self.logger.warning(f"{', '.join(new_critical)} on {self.config.hostname} went Critical, "
+                            f"history dumped to {path}")
+    
+    def format_for_telegraf(self, metrics: Dict[str, Any]) -> str:
+        """Format metrics for Telegraf input"""
+        return self.encode_line_protocol(samples_from_metrics(metrics), metrics.get("timestamp", int(time.time())),
+                                         metrics.get("ilo_host", "unknown"), metrics.get("ilo_version", "unknown"))
+    
+    def encode_line_protocol(self, samples: List[Sample], timestamp: int, host: str, version: str) -> str:
+        """Encode samples as InfluxDB line protocol; series without numeric fields are skipped"""
+        if host == self.config.hostname and version == self.config.version:
+            base_tags = self.base_tags
+        else:
+            base_tags = f"host={host},ilo_version={version}{self.tag_str}"
+        suffix = f" {timestamp}000000000"
+        
+        lines = []
+        for sample in samples:
+            tag_names, field_names = sample.layout
+            if not field_names:
+                continue
+            values = sample.values
+            # Escape tag values per line protocol (e.g. drive models)
+            tag_str = "".join(f",{name}={escape_tag(value)}" for name, value in zip(tag_names, values))
+            field_str = ",".join(f"{name}={value}" for name, value in zip(field_names, values[len(tag_names):]))
+            lines.append(f"ilo_{sample.key},{base_tags}{tag_str} {field_str}{suffix}")
+        
+        return "\n".join(lines)
+    
+    def format_ndjson(self, metrics: Dict[str, Any], per_metric: bool = False) -> str:
+        """Format metrics as compact NDJSON records (one per host, or one per series)"""
+        return self.encode_ndjson(samples_from_metrics(metrics), metrics.get("timestamp", int(time.time())),
+                                  metrics.get("ilo_host", "unknown"), metrics.get("ilo_version", "unknown"),
+                                  per_metric)
+    
+    def encode_ndjson(self, samples: List[Sample], timestamp: int, host: str, version: str,
+                      per_metric: bool = False) -> str:
+        """Encode samples as NDJSON records (see jsonio.encode_ndjson)"""
+        from .jsonio import encode_ndjson
+        return encode_ndjson(samples, timestamp, host, version, self.config.tags, per_metric)
+    
+    def encode_remote_write(self, samples: List[Sample], timestamp: int) -> bytes:
+        """Encode samples as an uncompressed Prometheus remote_write WriteRequest"""
+        from .remote_write import encode_write_request, host_labels
+        if self.base_labels is None:
+            self.base_labels = host_labels(self.config.hostname, self.config.version, self.config.tags)
+        return encode_write_request(samples, self.base_labels, timestamp)
+
+def collect_output(monitor: iLOMonitor, output_format: str, tracker: Optional['DeltaTracker'],
+                   rollup: Optional['RollupAggregator'] = None) -> Optional[Any]:
+    """Collect one host and encode it in the requested output format"""
+    return encode_output(monitor, monitor.collect_all_metrics(), output_format, tracker, rollup)
+
+def encode_output(monitor: iLOMonitor, metrics: Dict[str, Any], output_format: str,
+                  tracker: Optional['DeltaTracker'], rollup: Optional['RollupAggregator'] = None) -> Optional[Any]:
+    """Encode a host's collected metrics in the requested output format"""
+    if rollup:
+        # Rollups are built from the full result, before delta filtering
+        rollup.add(monitor.config.tags, metrics)
+    samples = samples_from_metrics(metrics)
+    
+    if tracker:
+        samples = tracker.filter(samples)
+    
+    if output_format == "json":
+        emitted = {sample.key for sample in samples}
+        return json.dumps({key: value for key, value in metrics.items() if key in HEADER_KEYS or key in emitted},
+                          indent=2)
+    timestamp, host, version = metrics["timestamp"], metrics["ilo_host"], metrics["ilo_version"]
+    if output_format == "remote_write":
+        return monitor.encode_remote_write(samples, timestamp) or None
+    if output_format in ("ndjson", "ndjson-metric"):
+        return monitor.encode_ndjson(samples, timestamp, host, version,
+                                     per_metric=output_format == "ndjson-metric") or None
+    return monitor.encode_line_protocol(samples, timestamp, host, version) or None
@@ -0,0 +1,262 @@
+"""
+Remote collection from the iLO REST API (Redfish on iLO 5, /rest/v1 on iLO 4)
+and other Redfish BMCs, following a discovered fetch plan (see discovery.py)
+"""
+
+import os
+import time
+from typing import Dict, Optional, Any
+
+from .discovery import PLAN_SCHEMA, discover_plan, fixed_plan, model_plan
+
+class RedfishCollector:
+    """Remote iLO collectors, mixed into iLOMonitor"""
+    
+    def _connect(self) -> None:
+        """Open the HTTP session to the iLO"""
+        # Imported here so local mode never loads requests and urllib3
+        from .transport import RedfishSession
+        self.transport = RedfishSession(self.config)
+        self.plan = None
+        self.plan_timestamp = 0
+        self.discovery_attempted = False  # Cleared at the start of every collection cycle
+    
+    def make_request(self, uri: str) -> Optional[Dict]:
+        """GET a resource by its path (``@odata.id``) from the iLO (remote mode only)"""
+        if self.local_mode:
+            self.logger.error("make_request called in local mode")
+            return None
+        return self.transport.get(uri)
+    
+    def _plan_files(self, key: Optional[str]) -> tuple:
+        """Per-host plan file (URIs) and the shared per-model plan file (fields, $expand)"""
+        host_file = os.path.join(self.config.cache_dir, f"redfish_host_{self.config.hostname}_{self.config.port}.json")
+        plan_file = os.path.join(self.config.cache_dir, "redfish_plans", f"{key}.json") if key else None
+        return host_file, plan_file
+    
+    def redfish_plan(self) -> Dict[str, Any]:
+        """Fetch plan for this host, re-discovered every ``discovery_interval`` seconds.
+        
+        Each host keeps a small file with its own URIs and the key of its
+        model/firmware data, so exec runs read two cache files instead of
+        walking the service root. A discovery failure falls back to the
+        fixed iLO URIs; discovery runs at most once per cycle, so it is
+        retried on the next cycle rather than by every collector.
+        """
+        interval = self.config.discovery_interval
+        if interval <= 0:
+            if self.plan is None:
+                self.plan = fixed_plan(self.config.version)
+            return self.plan
+        if self.plan is not None and (self.discovery_attempted or time.time() - self.plan_timestamp < interval):
+            return self.plan
+        
+        host_file, _ = self._plan_files(None)
+        pointer = self._load_cache_file(host_file)
+        if pointer and pointer.get("uris") and time.time() - pointer.get("timestamp", 0) < interval:
+            model_data = self._load_cached_model(pointer.get("key"))
+            if model_data:
+                plan = dict(model_data, uris=pointer["uris"], timestamp=pointer["timestamp"])
+                self.plan, self.plan_timestamp = plan, pointer["timestamp"]
+                return plan
+        
+        self.discovery_attempted = True
+        plan = discover_plan(self.make_request, self.config.version, self._load_cached_model)
+        if plan is None:
+            self.logger.warning(f"Redfish discovery failed for {self.config.hostname}, "
+                                f"using fixed iLO {self.config.version} URIs")
+            self.plan, self.plan_timestamp = fixed_plan(self.config.version), 0
+            return self.plan
+        
+        _, plan_file = self._plan_files(plan["key"])
+        if not os.path.exists(plan_file):
+            self.logger.info(f"Redfish fetch plan for {plan['vendor']} {plan['model']} "
+                             f"({plan['firmware']}): fields={plan['fields']}, expand={plan['expand']}")
+            self._save_cache_file(plan_file, model_plan(plan))
+        self.logger.debug(f"Redfish URIs for {self.config.hostname}: {plan['uris']}")
+        self.plan, self.plan_timestamp = plan, int(time.time())
+        self._save_cache_file(host_file, {"key": plan["key"], "timestamp": self.plan_timestamp, "uris": plan["uris"]})
+        return plan
+    
+    def _load_cached_model(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Field names and $expand support shared by every host of one model/firmware, if already probed"""
+        if not key:
+            return None
+        plan = self._load_cache_file(self._plan_files(key)[1])
+        if plan and plan.get("schema") == PLAN_SCHEMA:
+            return plan
+        return None
+    
+    def _planned_request(self, uri: str) -> Optional[Dict]:
+        """GET a planned URI; a 404 means this host's URIs are out of date and are walked again"""
+        data = self.make_request(uri)
+        if data is None and self.plan_timestamp and getattr(self.transport, "last_status", None) == 404:
+            # Only this host's URIs are dropped; the model data stays shared
+            self.logger.info(f"{uri} is gone on {self.config.hostname}, re-discovering its URIs")
+            host_file, _ = self._plan_files(None)
+            self.plan_timestamp = 0
+            self._save_cache_file(host_file, {"key": None, "timestamp": 0})
+        return data
+    
+    def _expanded_members(self, collection_uri: str, plan: Dict[str, Any]) -> list:
+        """Member resources of a collection, inline when the plan supports $expand"""
+        collection = self._planned_request(f"{collection_uri}?$expand=." if plan["expand"] else collection_uri)
+        if not collection:
+            return []
+        resources = []
+        for member in collection.get("Members", []):
+            if len(member) > 1:
+                resources.append(member)
+            elif member.get("@odata.id"):
+                detail = self.make_request(member["@odata.id"])
+                if detail:
+                    resources.append(detail)
+        return resources
+    
+    def _get_redfish_system_health(self) -> Dict[str, Any]:
+        """Get overall system health status"""
+        metrics = {}
+        plan = self.redfish_plan()
+        
+        data = self._planned_request(plan["uris"]["system"])
+        if data:
+            status = data.get("Status", {})
+            metrics["system_health"] = {
+                "state": status.get("State", "Unknown"),
+                "health": status.get("Health", "Unknown"),
+                # iLO4 REST API reports it as Power
+                "power_state": data.get("PowerState" if plan["dialect"] == "redfish" else "Power", "Unknown")
+            }
+        
+        return metrics
+    
+    def _get_redfish_thermal_metrics(self) -> Dict[str, Any]:
+        """Get temperature and fan metrics"""
+        metrics = {}
+        plan = self.redfish_plan()
+        fields = plan["fields"]
+        
+        thermal_data = self._planned_request(plan["uris"]["thermal"]) if plan["uris"]["thermal"] else None
+        if not thermal_data:
+            return metrics
+        
+        if plan["dialect"] == "redfish":
+            # Temperature sensors
+            temperatures = thermal_data.get(fields["temperatures"], [])
+            for temp in temperatures:
+                sensor_name = temp.get(fields["temperature_name"], "Unknown").replace(" ", "_").lower()
+                metrics[f"temperature_{sensor_name}"] = {
+                    "value": temp.get(fields["temperature_reading"], 0),
+                    "status": temp.get("Status", {}).get("Health", "Unknown"),
+                    "upper_threshold": temp.get("UpperThresholdCritical"),
+                    "lower_threshold": temp.get("LowerThresholdCritical")
+                }
+            
+            # Fan sensors
+            fans = thermal_data.get("Fans", [])
+            for fan in fans:
+                fan_name = fan.get(fields["fan_name"], "Unknown").replace(" ", "_").lower()
+                metrics[f"fan_{fan_name}"] = {
+                    "speed_rpm": fan.get(fields["fan_reading"], 0),
+                    "speed_percent": fan.get("ReadingUnits", 0),
+                    "status": fan.get("Status", {}).get("Health", "Unknown")
+                }
+        else:
+            # iLO4 thermal data
+            temperatures = thermal_data.get(fields["temperatures"], [])
+            for temp in temperatures:
+                sensor_name = temp.get(fields["temperature_name"], "Unknown").replace(" ", "_").lower()
+                metrics[f"temperature_{sensor_name}"] = {
+                    "value": temp.get(fields["temperature_reading"], 0),
+                    "status": temp.get("Status", {}).get("Health", "Unknown")
+                }
+            
+            fans = thermal_data.get("Fans", [])
+            for fan in fans:
+                fan_name = fan.get(fields["fan_name"], "Unknown").replace(" ", "_").lower()
+                metrics[f"fan_{fan_name}"] = {
+                    "speed_percent": fan.get(fields["fan_reading"], 0),
+                    "status": fan.get("Status", {}).get("Health", "Unknown")
+                }
+        
+        return metrics
+    
+    def _get_redfish_power_metrics(self) -> Dict[str, Any]:
+        """Get power supply and consumption metrics"""
+        metrics = {}
+        plan = self.redfish_plan()
+        
+        power_data = self._planned_request(plan["uris"]["power"]) if plan["uris"]["power"] else None
+        if not power_data:
+            return metrics
+        
+        power_supplies = power_data.get("PowerSupplies", [])
+        if plan["dialect"] == "redfish":
+            # Power supplies
+            for i, ps in enumerate(power_supplies):
+                metrics[f"power_supply_{i+1}"] = {
+                    "status": ps.get("Status", {}).get("Health", "Unknown"),
+                    "state": ps.get("Status", {}).get("State", "Unknown"),
+                    "power_capacity": ps.get("PowerCapacityWatts", 0),
+                    "power_output": ps.get("PowerOutputWatts", 0)
+                }
+            
+            # Power consumption
+            power_control = power_data.get("PowerControl", [])
+            if power_control:
+                pc = power_control[0]
+                metrics["power_consumption"] = {
+                    "current_watts": pc.get("PowerConsumedWatts", 0),
+                    "average_watts": pc.get("AverageConsumedWatts", 0),
+                    "max_watts": pc.get("PowerCapacityWatts", 0)
+                }
+        else:
+            # iLO4 power data
+            for i, ps in enumerate(power_supplies):
+                metrics[f"power_supply_{i+1}"] = {
+                    "status": ps.get("Status", {}).get("Health", "Unknown"),
+                    "state": ps.get("Status", {}).get("State", "Unknown")
+                }
+        
+        return metrics
+    
+    def _get_redfish_memory_metrics(self) -> Dict[str, Any]:
+        """Get memory module status"""
+        metrics = {}
+        plan = self.redfish_plan()
+        
+        # Only the Redfish memory schema is parsed; the plan has no URI otherwise
+        if plan["uris"]["memory"]:
+            for mem_detail in self._expanded_members(plan["uris"]["memory"], plan):
+                slot = mem_detail.get("DeviceLocator", "Unknown")
+                metrics[f"memory_{slot}"] = {
+                    "status": mem_detail.get("Status", {}).get("Health", "Unknown"),
+                    "size_mb": mem_detail.get("CapacityMiB", 0),
+                    "speed_mhz": mem_detail.get("OperatingSpeedMhz", 0),
+                    "manufacturer": mem_detail.get("Manufacturer", "Unknown")
+                }
+        
+        return metrics
+    
+    def _get_redfish_storage_metrics(self) -> Dict[str, Any]:
+        """Get storage device status"""
+        metrics = {}
+        plan = self.redfish_plan()
+        
+        if plan["uris"]["storage"]:
+            for storage_detail in self._expanded_members(plan["uris"]["storage"], plan):
+                drives = storage_detail.get("Drives", [])
+                for drive in drives:
+                    drive_url = drive.get("@odata.id", "")
+                    if drive_url:
+                        drive_detail = self.make_request(drive_url)
+                        if drive_detail:
+                            drive_name = drive_detail.get("Name", "Unknown").replace(" ", "_").lower()
+                            metrics[f"drive_{drive_name}"] = {
+                                "status": drive_detail.get("Status", {}).get("Health", "Unknown"),
+                                "capacity_gb": drive_detail.get("CapacityBytes", 0) // (1024**3),
+                                "protocol": drive_detail.get("Protocol", "Unknown"),
+                                "media_type": drive_detail.get("MediaType", "Unknown")
+                            }
+        
+        return metrics
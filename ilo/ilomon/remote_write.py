@@ -0,0 +1,111 @@
+"""
+Prometheus remote_write encoding: metric naming, protobuf and snappy framing
+
+Only loaded for remote_write output.
+"""
+
+import bisect
+import functools
+import re
+import struct
+from typing import Dict, List, Tuple
+
+from .samples import Sample
+
+def _snappy_literal(data: bytes) -> bytes:
+    """Snappy block encoding using only literals (valid, uncompressed)"""
+    out = bytearray(_pb_varint(len(data)))
+    for offset in range(0, len(data), 65536):
+        chunk = data[offset:offset + 65536]
+        length = len(chunk) - 1
+        if length < 60:
+            out.append(length << 2)
+        elif length < 256:
+            out += bytes([60 << 2, length])
+        else:
+            out += bytes([61 << 2]) + length.to_bytes(2, 'little')
+        out += chunk
+    return bytes(out)
+
+# Prometheus remote_write needs snappy; python-snappy compresses, the fallback only frames
+try:
+    import snappy
+    snappy_compress = snappy.compress
+except ImportError:
+    snappy_compress = _snappy_literal
+
+def _pb_varint(value: int) -> bytes:
+    """Protobuf base-128 varint"""
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def _pb_bytes(field_number: int, data: bytes) -> bytes:
+    """Protobuf length-delimited field"""
+    return _pb_varint(field_number << 3 | 2) + _pb_varint(len(data)) + data
+
+def _pb_label(name: str, value: str) -> bytes:
+    """prometheus.Label{name = 1, value = 2}"""
+    return _pb_bytes(1, _pb_bytes(1, name.encode()) + _pb_bytes(2, value.encode()))
+
+# Series key prefixes that become one Prometheus metric family with a "sensor" label
+PROMETHEUS_FAMILIES = ("storage_controller", "storage_logical_drive", "storage_array", "power_supply",
+                       "drive_smart", "temperature", "memory", "drive", "fan")
+PROMETHEUS_SINGLE_SERIES = {"memory_usage": "memory_usage", "memory_health": "memory_health",
+                            "system_health": "health"}
+
+@functools.lru_cache(maxsize=65536)
+def prometheus_family(key: str) -> Tuple[str, str]:
+    """Split a series key into (metric family, sensor label), e.g. temperature_cpu_1 -> (temperature, cpu_1)"""
+    if key in PROMETHEUS_SINGLE_SERIES:
+        return PROMETHEUS_SINGLE_SERIES[key], ""
+    for family in PROMETHEUS_FAMILIES:
+        if key.startswith(family + "_"):
+            return family, key[len(family) + 1:]
+    return re.sub(r'[^a-zA-Z0-9_]', '_', key), ""
+
+@functools.lru_cache(maxsize=65536)
+def prometheus_name(name: str) -> str:
+    """Sanitise a metric or label name; status *_numeric fields become *_code as in the alert rules"""
+    name = re.sub(r'_numeric$', '_code', re.sub(r'[^a-zA-Z0-9_]', '_', name))
+    return f"_{name}" if name[:1].isdigit() else name
+
+def host_labels(hostname: str, version: str, tags: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    """Labels shared by every series of a host: host, ilo_version and its config tags"""
+    return tuple(sorted(
+        [("host", hostname), ("ilo_version", version)]
+        + [(prometheus_name(str(key)), str(value)) for key, value in tags.items()
+           if key not in ("host", "ilo_version") and value not in ("", None)]
+    ))
+
+def encode_write_request(samples: List[Sample], base_labels: Tuple[Tuple[str, str], ...], timestamp: int) -> bytes:
+    """Encode samples as an uncompressed Prometheus remote_write WriteRequest.
+    
+    Every numeric field becomes ilo_<family>_<field>; per-sensor series keep
+    the sensor name as a "sensor" label, tags become labels. Serialised
+    WriteRequests can be concatenated into one larger request.
+    """
+    timestamp_ms = _pb_varint(timestamp * 1000)
+    timeseries = []
+    for sample in samples:
+        tag_names, field_names = sample.layout
+        if not field_names:
+            continue
+        family, sensor = prometheus_family(sample.key)
+        labels = dict(base_labels)
+        labels.update((prometheus_name(name), value) for name, value in zip(tag_names, sample.values))
+        if sensor:
+            labels["sensor"] = sensor
+        # Labels must be sorted by name, including __name__
+        names = sorted(labels)
+        position = bisect.bisect_left(names, "__name__")
+        before = b"".join(_pb_label(name, labels[name]) for name in names[:position])
+        after = b"".join(_pb_label(name, labels[name]) for name in names[position:])
+        for field, value in zip(field_names, sample.values[len(tag_names):]):
+            name_label = _pb_label("__name__", f"ilo_{family}_{prometheus_name(field)}")
+            point = b"\x09" + struct.pack("<d", float(value)) + b"\x10" + timestamp_ms
+            timeseries.append(_pb_bytes(1, before + name_label + after + _pb_bytes(2, point)))
+    return b"".join(timeseries)
@@ -0,0 +1,136 @@
+"""
+Per-rack and per-datacenter rollups computed in the collector
+
+Capacity dashboards sum power and count degraded components per rack and
+datacenter. Aggregating thousands of hosts' series in PromQL on every
+refresh is slow, so with ``--rollups datacenter,rack`` the collector adds a
+few series per group each cycle, built from the hosts' config ``tags``.
+"""
+
+import json
+import re
+from typing import Dict, List, Optional, Any, Tuple
+
+from .samples import STATUS_NUMERIC, Sample, escape_tag
+
+# Chassis air intake sensors; power supply inlets are internal and left out.
+# Plain ambient sensors are only used on hosts without an inlet sensor.
+INLET_SENSOR = re.compile(r'inlet|intake')
+AMBIENT_SENSOR = re.compile(r'ambient|ambnt')
+POWER_SUPPLY_SENSOR = re.compile(r'p/?s_?\d|psu|power_supply')
+
+def host_summary(metrics: Dict[str, Any]) -> Tuple[Optional[float], Optional[float], int, int]:
+    """Current watts, max inlet temperature and Critical/Warning component counts of one host"""
+    watts = metrics.get("power_consumption", {}).get("current_watts")
+    if not isinstance(watts, (int, float)):
+        watts = None
+    
+    inlet = ambient = None
+    critical = warning = 0
+    for key, value in metrics.items():
+        if not isinstance(value, dict):
+            continue
+        reading = value.get("value")
+        if key.startswith("temperature_") and isinstance(reading, (int, float)) \
+                and not POWER_SUPPLY_SENSOR.search(key):
+            if INLET_SENSOR.search(key):
+                inlet = reading if inlet is None else max(inlet, reading)
+            elif AMBIENT_SENSOR.search(key):
+                ambient = reading if ambient is None else max(ambient, reading)
+        worst = max(STATUS_NUMERIC.get(value.get(name), 0) for name in ("status", "health"))
+        # Components reported as numeric fields (e.g. Smart Array cache and battery)
+        worst = max([worst] + [reading for name, reading in value.items()
+                               if name.endswith("_status_numeric") and isinstance(reading, int)])
+        if worst == 3:
+            critical += 1
+        elif worst == 2:
+            warning += 1
+    
+    return watts, inlet if inlet is not None else ambient, critical, warning
+
+class RollupAggregator:
+    """Totals per rollup group for one collection cycle.
+    
+    ``tag_names`` are nested levels, outermost first: with
+    ("datacenter", "rack") every host counts towards its datacenter and
+    towards its (datacenter, rack) group. Hosts without a level's tag are
+    left out of that level. Group state is a plain dict so worker processes
+    can send theirs to the parent to be merged. ``replica`` names this
+    collector when the fleet is sharded; it is added as a ``replica`` tag so
+    the replicas' partial rollups stay separate series.
+    """
+    
+    def __init__(self, tag_names: List[str], replica: Optional[str] = None):
+        self.tag_names = tag_names
+        self.replica = replica
+        # (depth, tag values) -> [hosts, hosts reporting power, total watts, max inlet, critical, warning]
+        self.groups = {}
+    
+    def add(self, tags: Dict[str, str], metrics: Dict[str, Any]) -> None:
+        """Count one host's collection towards each of its groups"""
+        watts, inlet, critical, warning = host_summary(metrics)
+        for depth in range(1, len(self.tag_names) + 1):
+            values = tuple(tags.get(name) for name in self.tag_names[:depth])
+            if None in values or "" in values:
+                continue
+            self._merge_group((depth, values), [1, int(watts is not None), watts or 0, inlet, critical, warning])
+    
+    def _merge_group(self, key: Tuple[int, Tuple[str, ...]], totals: List[Any]) -> None:
+        group = self.groups.get(key)
+        if group is None:
+            self.groups[key] = list(totals)
+            return
+        for i in (0, 1, 2, 4, 5):
+            group[i] += totals[i]
+        if totals[3] is not None and (group[3] is None or totals[3] > group[3]):
+            group[3] = totals[3]
+    
+    def merge(self, groups: Dict[Tuple[int, Tuple[str, ...]], List[Any]]) -> None:
+        """Add the groups of another aggregator (e.g. from a worker process)"""
+        for key, totals in groups.items():
+            self._merge_group(key, totals)
+    
+    def reset(self) -> None:
+        self.groups = {}
+    
+    def samples(self) -> List[Sample]:
+        """One rollup_<level> sample per group"""
+        samples = []
+        for (depth, values), (hosts, power_hosts, watts, inlet, critical, warning) in sorted(self.groups.items()):
+            fields = [("hosts", hosts), ("power_hosts", power_hosts), ("total_watts", watts)]
+            if power_hosts:
+                fields.append(("avg_watts", round(watts / power_hosts, 1)))
+            if inlet is not None:
+                fields.append(("max_inlet_temperature", inlet))
+            fields += [("critical_components", critical), ("warning_components", warning)]
+            tags = list(zip(self.tag_names[:depth], values))
+            if self.replica:
+                tags.append(("replica", self.replica))
+            samples.append(Sample.from_pairs(f"rollup_{self.tag_names[depth - 1]}", tags, fields))
+        return samples
+    
+    def encode(self, output_format: str, timestamp: int) -> Optional[Any]:
+        """Encode the rollups in the collector's output format; None if there are none"""
+        samples = self.samples()
+        if not samples:
+            return None
+        
+        if output_format == "remote_write":
+            from .remote_write import encode_write_request
+            return encode_write_request(samples, (), timestamp)
+        
+        records = [{"rollup": sample.key[len("rollup_"):], "tags": dict(sample.tags), "fields": dict(sample.fields)}
+                   for sample in samples]
+        if output_format == "json":
+            return json.dumps({"timestamp": timestamp, "rollups": records}, indent=2)
+        if output_format in ("ndjson", "ndjson-metric"):
+            from .jsonio import NDJSON_SCHEMA_VERSION, json_dumps_compact
+            return "\n".join(json_dumps_compact(dict(schema=NDJSON_SCHEMA_VERSION, timestamp=timestamp, **record))
+                             for record in records)
+        
+        lines = []
+        for sample in samples:
+            tag_str = "".join(f",{name}={escape_tag(value)}" for name, value in sample.tags)
+            field_str = ",".join(f"{name}={value}" for name, value in sample.fields)
+            lines.append(f"ilo_{sample.key}{tag_str} {field_str} {timestamp}000000000")
+        return "\n".join(lines)
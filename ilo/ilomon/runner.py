@@ -0,0 +1,254 @@
+"""
+Full command line: config file, single host and daemon modes, sharding,
+worker processes and output sinks
+"""
+
+import argparse
+import os
+import re
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import List, Optional
+
+from .config import iLOConfig, load_config
+from .fleet import CollectorPool, MonitorGroup, select_shard
+from .logs import get_logger, setup_logging
+
+def config_file_mtime(config_file: str) -> Optional[float]:
+    """Modification time of the config file, or None if it cannot be read"""
+    try:
+        return os.stat(config_file).st_mtime
+    except OSError:
+        return None
+
+def shard_member(args: argparse.Namespace) -> Optional[str]:
+    """This replica's name when --shard or --shard-members splits the fleet, else None"""
+    if args.shard:
+        # int() so a zero-padded index (--shard 01/3) names the same member as 1/3
+        return f"shard-{int(args.shard.partition('/')[0])}"
+    if args.shard_members:
+        return args.shard_member
+    return None
+
+def shard_configs(configs: List[iLOConfig], args: argparse.Namespace) -> List[iLOConfig]:
+    """Split the fleet across collector replicas according to --shard or --shard-members"""
+    if args.shard:
+        shard_match = re.match(r'^(\d+)/(\d+)$', args.shard)
+        if not shard_match or not 1 <= int(shard_match.group(1)) <= int(shard_match.group(2)):
+            get_logger(__name__).error(f"Invalid --shard {args.shard}, expected I/N with 1 <= I <= N")
+            sys.exit(1)
+        members = [f"shard-{i}" for i in range(1, int(shard_match.group(2)) + 1)]
+        return select_shard(configs, shard_member(args), members)
+    if args.shard_members:
+        members = [member.strip() for member in args.shard_members.split(',') if member.strip()]
+        if args.shard_member not in members:
+            get_logger(__name__).error(f"--shard-member {args.shard_member} is not in --shard-members")
+            sys.exit(1)
+        return select_shard(configs, args.shard_member, members)
+    return configs
+
+def dump_history(target: str, config_file: str) -> None:
+    """Print a host's history ring as CSV (--dump-history HOST[:PORT])"""
+    from .history import HistoryRing, history_path
+    hostname, _, port = target.partition(':')
+    config = iLOConfig(hostname=hostname, username="", password="", version="5", port=int(port or 443))
+    # The host's cache_dir and port come from the config file when it lists the host
+    for candidate in (load_config(config_file) if os.path.exists(config_file) else []):
+        if candidate.hostname == hostname and (not port or candidate.port == config.port):
+            config = candidate
+            break
+    path = history_path(config.cache_dir, config.hostname, config.port)
+    if not os.path.exists(path):
+        get_logger(__name__).error(f"No history for {target} ({path} not found)")
+        sys.exit(1)
+    ring = HistoryRing(path, readonly=True)
+    try:
+        ring.write_csv(sys.stdout)
+    finally:
+        ring.close()
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="iLO Hardware Monitor for Telegraf")
+    parser.add_argument("--config", "-c", default="ilo_config.json",
+                       help="Configuration file path")
+    parser.add_argument("--host", help="Single iLO hostname to monitor")
+    parser.add_argument("--username", "-u", help="iLO username")
+    parser.add_argument("--password", "-p", help="iLO password")
+    parser.add_argument("--version", "-v", choices=["4", "5"], default="5",
+                       help="iLO version (4 or 5)")
+    parser.add_argument("--local", action="store_true",
+                       help="Monitor local host directly (bypass iLO)")
+    parser.add_argument("--output", "-o", choices=["json", "telegraf", "ndjson", "ndjson-metric"],
+                       default="telegraf",
+                       help="Output format (ndjson: one record per host, ndjson-metric: one per series)")
+    parser.add_argument("--daemon", action="store_true",
+                       help="Keep running and collect every --interval seconds (for Telegraf execd)")
+    parser.add_argument("--interval", type=int, default=60,
+                       help="Collection interval in seconds for --daemon")
+    parser.add_argument("--sample-interval", type=float, default=0,
+                       help="With --daemon, sample cheap sources every N seconds and emit window statistics")
+    parser.add_argument("--history-seconds", type=int, default=0,
+                       help="With --sample-interval, keep this many seconds of samples per host on disk")
+    parser.add_argument("--dump-history", metavar="HOST[:PORT]",
+                       help="Print a host's sample history as CSV and exit")
+    parser.add_argument("--delta", action="store_true",
+                       help="Emit only series that changed since they were last emitted")
+    parser.add_argument("--heartbeat", type=int, default=10,
+                       help="With --delta, emit every series every N cycles")
+    parser.add_argument("--trends", action="store_true",
+                       help="With --daemon, add slope, baseline, z-score and trend_warning fields to temperature, "
+                            "fan and power series (requires NumPy)")
+    parser.add_argument("--trend-window", type=int, default=1800,
+                       help="Seconds of readings the --trends slope is fitted over")
+    parser.add_argument("--trend-baseline", type=int, default=86400,
+                       help="Half-life in seconds of the --trends baseline")
+    parser.add_argument("--rollups", metavar="TAG[,TAG...]",
+                       help="Also emit per-group power/inlet/health rollups by these host tags, outermost first "
+                            "(e.g. datacenter,rack)")
+    parser.add_argument("--shard", metavar="I/N",
+                       help="Collect only shard I of N (1-based) of the configured hosts")
+    parser.add_argument("--shard-members",
+                       help="Comma-separated replica names to shard across by rendezvous hashing")
+    parser.add_argument("--shard-member", default=socket.gethostname(),
+                       help="This replica's name in --shard-members (default: hostname)")
+    parser.add_argument("--workers", type=int, default=1,
+                       help="Collect in N worker processes (for fleets of thousands of hosts)")
+    parser.add_argument("--sink",
+                       help="Send output to this URL instead of stdout (see --sink-type; HTTP sinks ignore --output)")
+    parser.add_argument("--sink-type", choices=["influx", "remote_write", "socket"], default="socket",
+                       help="socket: tcp://host:port line listener; influx: /api/v2/write URL; "
+                            "remote_write: Prometheus remote_write URL")
+    parser.add_argument("--sink-token", default=os.environ.get("ILO_MONITOR_SINK_TOKEN"),
+                       help="Influx token or remote_write bearer token (default: $ILO_MONITOR_SINK_TOKEN)")
+    parser.add_argument("--spool-dir", default="/var/tmp/ilo-monitor/spool",
+                       help="Directory for output spooled while the sink is unavailable")
+    parser.add_argument("--spool-max-mb", type=int, default=256, help="Maximum spool size in MB")
+    parser.add_argument("--spool-max-age", type=int, default=86400,
+                       help="Drop spooled output older than this many seconds")
+    parser.add_argument("--replay-rate", type=float, default=200,
+                       help="Spooled records replayed per second once the sink is back")
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    
+    args = parser.parse_args(argv)
+    
+    setup_logging(args.debug)
+    
+    if args.dump_history:
+        dump_history(args.dump_history, args.config)
+        return
+    if args.sample_interval > 0 and not args.daemon:
+        parser.error("--sample-interval requires --daemon")
+    if args.history_seconds > 0 and not (args.daemon and args.sample_interval > 0):
+        parser.error("--history-seconds requires --daemon and --sample-interval")
+    if args.trends:
+        from .trends import np
+        if not args.daemon:
+            parser.error("--trends requires --daemon")
+        if np is None:
+            get_logger(__name__).error("--trends requires NumPy (pip3 install numpy)")
+            sys.exit(1)
+    
+    # Local mode
+    if args.local:
+        config = iLOConfig(
+            hostname="localhost",
+            username="",
+            password="",
+            version=args.version,
+            local_mode=True
+        )
+        configs = [config]
+    # Single host mode
+    elif args.host:
+        if not args.username or not args.password:
+            parser.error("Username and password required for single host mode (unless using --local)")
+        
+        config = iLOConfig(
+            hostname=args.host,
+            username=args.username,
+            password=args.password,
+            version=args.version,
+            local_mode=False
+        )
+        configs = [config]
+    else:
+        # Config file mode
+        configs = load_config(args.config)
+        if not configs:
+            get_logger(__name__).error(f"No valid configurations found in {args.config}")
+            sys.exit(1)
+        
+        configs = shard_configs(configs, args)
+    
+    writer = None
+    if args.sink:
+        from .sinks import SINK_TYPES, OutputSpool, SinkWriter, SocketSink
+        try:
+            sink_class = SINK_TYPES[args.sink_type]
+            sink = sink_class(args.sink) if sink_class is SocketSink else sink_class(args.sink, args.sink_token)
+        except ValueError as e:
+            get_logger(__name__).error(e)
+            sys.exit(1)
+        writer = SinkWriter(sink, OutputSpool(args.spool_dir, args.spool_max_mb * 1024 * 1024, args.spool_max_age),
+                            args.replay_rate)
+    
+    # HTTP sinks dictate their own encoding
+    output_format = args.output
+    if writer and writer.sink.output_format:
+        output_format = writer.sink.output_format
+    
+    rollup_tags = [tag.strip() for tag in (args.rollups or "").split(',') if tag.strip()]
+    # Sharded replicas each roll up part of a group; tag them apart so their series don't collide
+    rollup_replica = shard_member(args) if rollup_tags and not args.local and not args.host else None
+    trend_window = max(1, round(args.trend_window / max(1, args.interval))) if args.trends else 0
+    if args.workers > 1:
+        collector = CollectorPool(configs, args.workers, output_format, args.daemon, args.sample_interval,
+                                  args.delta, args.heartbeat, args.history_seconds, rollup_tags,
+                                  trend_window, args.trend_baseline, rollup_replica)
+    else:
+        collector = MonitorGroup(output_format, args.daemon, args.sample_interval, args.delta, args.heartbeat,
+                                 args.history_seconds, rollup_tags, trend_window, args.trend_baseline, rollup_replica)
+        collector.update(configs)
+    
+    # In daemon mode the config file is re-read on SIGHUP or when it changes on disk
+    watch_config = args.daemon and not args.local and not args.host
+    reload_requested = threading.Event()
+    config_mtime = config_file_mtime(args.config) if watch_config else None
+    if watch_config:
+        signal.signal(signal.SIGHUP, lambda signum, frame: reload_requested.set())
+    
+    try:
+        while True:
+            cycle_start = time.monotonic()
+            if watch_config:
+                mtime = config_file_mtime(args.config)
+                if reload_requested.is_set() or mtime != config_mtime:
+                    reload_requested.clear()
+                    new_configs = load_config(args.config)
+                    if new_configs:
+                        config_mtime = mtime
+                        collector.update(shard_configs(new_configs, args))
+                    else:
+                        # Possibly caught mid-write: keep the current hosts and try again next cycle
+                        get_logger(__name__).error(f"Reload of {args.config} found no valid hosts, "
+                                                   f"keeping the current host set and retrying next cycle")
+                        reload_requested.set()
+            collector.run_cycle(writer)
+            if not args.daemon:
+                if writer:
+                    # Exec mode: replay at most one second's worth of backlog per run
+                    writer.flush()
+                    writer.replay(int(args.replay_rate))
+                break
+            remaining = max(0, args.interval - (time.monotonic() - cycle_start))
+            if writer:
+                writer.wait(remaining)
+            else:
+                time.sleep(remaining)
+    finally:
+        collector.stop()
+        if writer:
+            writer.close()
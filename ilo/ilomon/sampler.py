@@ -0,0 +1,171 @@
+"""
+High-frequency sampling between output cycles (daemon mode)
+"""
+
+import glob
+import math
+import os
+import re
+import threading
+import time
+from typing import Dict, Any, TYPE_CHECKING
+
+from .discovery import fixed_plan
+
+if TYPE_CHECKING:
+    from .monitor import iLOMonitor
+
+# Series only the sampler reads; the other sampled series only add window
+# fields to what the collector emitted
+STANDALONE_SERIES = frozenset(["rapl_power", "cpu_utilization"])
+
+class WindowSampler:
+    """Fast background sampling of cheap sources between output cycles.
+    
+    Local hosts sample sysfs hwmon temperatures, RAPL package power and
+    /proc/stat CPU utilisation; remote hosts poll the Redfish power reading
+    over a session of their own, so the collection thread's connection and
+    response status are never shared with this thread.
+    At each output cycle the window is summarised into min/max/mean/p95
+    fields so short spikes are visible without raising the output rate.
+    Every sample is also written to the monitor's HistoryRing, if it has one.
+    """
+    
+    def __init__(self, monitor: 'iLOMonitor', sample_interval: float):
+        self.monitor = monitor
+        self.sample_interval = sample_interval
+        self.samples = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.window_start = time.monotonic()
+        self._hwmon_files = []
+        self._last_rapl = None
+        self._last_cpu = None
+        self.transport = None
+    
+    def start(self) -> None:
+        """Start the sampling thread"""
+        self._hwmon_files = glob.glob('/sys/class/hwmon/hwmon*/temp*_input')
+        if not self.monitor.local_mode:
+            from .transport import RedfishSession
+            self.transport = RedfishSession(self.monitor.config)
+        self.thread = threading.Thread(target=self._run, name=f"sampler-{self.monitor.config.hostname}",
+                                       daemon=True)
+        self.thread.start()
+    
+    def stop(self) -> None:
+        """Stop the sampling thread"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+        if self.transport:
+            self.transport.close()
+    
+    def _run(self) -> None:
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            try:
+                readings = self._sample_local() if self.monitor.local_mode else self._sample_remote()
+            except Exception as e:
+                self.monitor.logger.debug(f"Sampling error: {e}")
+                readings = {}
+            
+            with self.lock:
+                for series, value in readings.items():
+                    self.samples.setdefault(series, []).append(value)
+            
+            if self.monitor.history and readings:
+                self.monitor.history.append(time.time(), {
+                    f"{series}.{field}": value for (series, field, _), value in readings.items()
+                })
+            
+            self.stop_event.wait(max(0, self.sample_interval - (time.monotonic() - started)))
+    
+    def _sample_local(self) -> Dict[tuple, float]:
+        """Read one sample from local sysfs and /proc sources"""
+        readings = {}
+        
+        for temp_file in self._hwmon_files:
+            try:
+                with open(temp_file, 'r') as f:
+                    value = int(f.read().strip()) / 1000.0
+            except (ValueError, IOError):
+                continue
+            hwmon_dir = os.path.dirname(temp_file)
+            sensor_id = os.path.basename(temp_file).replace('_input', '')
+            try:
+                with open(os.path.join(hwmon_dir, 'name'), 'r') as f:
+                    hwmon_name = f.read().strip().replace('-', '_').replace(' ', '_')
+            except IOError:
+                hwmon_name = "hwmon"
+            readings[(f"temperature_hwmon_{hwmon_name}_{sensor_id}", "value", "hwmon")] = value
+        
+        # Package power from the RAPL energy counters of the top-level domains
+        now = time.monotonic()
+        energy = 0
+        for rapl_file in glob.glob('/sys/class/powercap/intel-rapl:*/energy_uj'):
+            if re.search(r'intel-rapl:\d+$', os.path.dirname(rapl_file)):
+                try:
+                    with open(rapl_file, 'r') as f:
+                        energy += int(f.read().strip())
+                except (ValueError, IOError):
+                    continue
+        if energy:
+            if self._last_rapl and energy >= self._last_rapl[1]:
+                watts = (energy - self._last_rapl[1]) / (now - self._last_rapl[0]) / 1e6
+                readings[("rapl_power", "watts", "intel_rapl")] = watts
+            self._last_rapl = (now, energy)
+        
+        # CPU utilisation from the aggregate /proc/stat line
+        try:
+            with open('/proc/stat', 'r') as f:
+                cpu_times = [int(v) for v in f.readline().split()[1:]]
+            idle = cpu_times[3] + (cpu_times[4] if len(cpu_times) > 4 else 0)
+            total = sum(cpu_times)
+            if self._last_cpu and total > self._last_cpu[1]:
+                busy = 1 - (idle - self._last_cpu[0]) / (total - self._last_cpu[1])
+                readings[("cpu_utilization", "percent", "proc_stat")] = busy * 100
+            self._last_cpu = (idle, total)
+        except (ValueError, IOError, IndexError):
+            pass
+        
+        return readings
+    
+    def _sample_remote(self) -> Dict[tuple, float]:
+        """Read the instantaneous power draw from the iLO"""
+        # The collection cycle owns discovery; use its plan once there is one
+        plan = self.monitor.plan or fixed_plan(self.monitor.config.version)
+        if not plan["uris"]["power"]:
+            return {}
+        power_data = self.transport.get(plan["uris"]["power"])
+        if not power_data:
+            return {}
+        
+        power_control = power_data.get("PowerControl") or [{}]
+        watts = power_control[0].get("PowerConsumedWatts", power_data.get("PowerConsumedWatts"))
+        if isinstance(watts, (int, float)):
+            return {("power_consumption", "current_watts", "redfish"): watts}
+        return {}
+    
+    def drain(self) -> Dict[str, Any]:
+        """Summarise and reset the current sampling window"""
+        with self.lock:
+            samples, self.samples = self.samples, {}
+        window_seconds = round(time.monotonic() - self.window_start, 1)
+        self.window_start = time.monotonic()
+        # Pick up hot-plugged sensors for the next window
+        self._hwmon_files = glob.glob('/sys/class/hwmon/hwmon*/temp*_input')
+        
+        metrics = {}
+        for (series, field, source), values in samples.items():
+            values.sort()
+            entry = metrics.setdefault(series, {"source": source})
+            entry[f"{field}_min"] = round(values[0], 2)
+            entry[f"{field}_max"] = round(values[-1], 2)
+            entry[f"{field}_mean"] = round(sum(values) / len(values), 2)
+            entry[f"{field}_p95"] = round(values[max(0, math.ceil(0.95 * len(values)) - 1)], 2)
+            entry["window_samples"] = len(values)
+            entry["window_seconds"] = window_seconds
+        
+        return metrics
@@ -0,0 +1,86 @@
+"""
+Collected series: the intermediate form every output encoder works from
+"""
+
+import sys
+import functools
+from typing import Dict, List, Any, Tuple
+
+@functools.lru_cache(maxsize=65536)
+def escape_tag(value: str) -> str:
+    """Escape a line protocol tag key or value"""
+    return value.replace(' ', '\\ ').replace(',', '\\,').replace('=', '\\=')
+
+# Numeric encoding of status/health/state strings, added as <name>_numeric fields
+STATUS_NUMERIC = {
+    "OK": 1, "Good": 1, "Enabled": 1, "On": 1,
+    "Warning": 2, "Degraded": 2,
+    "Predictive Failure": 2, "Interim Recovery Mode": 2, "Recovering": 2,
+    "Critical": 3, "Error": 3, "Failed": 3, "Off": 3,
+    "Unknown": 0, "Absent": 0
+}
+STATUS_TAGS = frozenset(["status", "health", "state"])
+HEADER_KEYS = frozenset(["timestamp", "ilo_host", "ilo_version"])
+
+# Shared (tag names, field names) layouts, one per distinct series shape
+_SAMPLE_LAYOUTS = {}
+
+class Sample:
+    """One series from one collection: its key, string tags and numeric fields.
+    
+    Tag and field names live in a layout tuple shared by every series of the
+    same shape, and keys and tag values are interned, so the strings repeated
+    across sensors and hosts ("status", "OK", "source", ...) are stored once
+    per process. A sample itself only holds its key, layout and value tuple.
+    """
+    
+    __slots__ = ("key", "layout", "values")
+    
+    def __init__(self, key: str, tag_names: Tuple[str, ...], field_names: Tuple[str, ...], values: Tuple[Any, ...]):
+        layout = (tag_names, field_names)
+        self.key = sys.intern(key)
+        self.layout = _SAMPLE_LAYOUTS.setdefault(layout, layout)
+        self.values = values
+    
+    @property
+    def tags(self) -> Tuple[Tuple[str, str], ...]:
+        return tuple(zip(self.layout[0], self.values))
+    
+    @property
+    def fields(self) -> Tuple[Tuple[str, Any], ...]:
+        return tuple(zip(self.layout[1], self.values[len(self.layout[0]):]))
+    
+    @classmethod
+    def from_pairs(cls, key: str, tags: List[Tuple[str, str]], fields: List[Tuple[str, Any]]) -> 'Sample':
+        return cls(key, tuple(sys.intern(name) for name, _ in tags), tuple(sys.intern(name) for name, _ in fields),
+                   tuple(sys.intern(value) for _, value in tags) + tuple(value for _, value in fields))
+
+def samples_from_metrics(metrics: Dict[str, Any]) -> List[Sample]:
+    """Convert a collector result into samples, classifying every value once"""
+    intern = sys.intern
+    samples = []
+    for key, value in metrics.items():
+        if key in HEADER_KEYS:
+            continue
+        if isinstance(value, dict):
+            tag_names = []
+            tag_values = []
+            field_names = []
+            field_values = []
+            for subkey, subvalue in value.items():
+                if isinstance(subvalue, (int, float)):
+                    field_names.append(subkey)
+                    field_values.append(subvalue)
+                elif isinstance(subvalue, str) and subvalue:
+                    if subkey in STATUS_TAGS:
+                        field_names.append(f"{subkey}_numeric")
+                        field_values.append(STATUS_NUMERIC.get(subvalue, 0))
+                    tag_names.append(subkey)
+                    tag_values.append(intern(subvalue))
+            tag_values.extend(field_values)
+            samples.append(Sample(key, tuple(tag_names), tuple(field_names), tuple(tag_values)))
+        elif isinstance(value, (int, float)):
+            samples.append(Sample(key, (), ("value",), (value,)))
+        elif isinstance(value, str):
+            samples.append(Sample(key, ("value",), ("present",), (intern(value), 1)))
+    return samples
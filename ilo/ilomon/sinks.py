@@ -0,0 +1,372 @@
+"""
+Output sinks (TCP line listener, InfluxDB, Prometheus remote_write) and the
+on-disk spool that holds output while a sink is unavailable
+"""
+
+import json
+import glob
+import gzip
+import logging
+import os
+import re
+import socket
+import struct
+import time
+import zlib
+from typing import Dict, List, Optional, Any, Tuple
+
+import requests
+
+from .remote_write import snappy_compress
+
+class SocketSink:
+    """Line-oriented TCP sink such as Telegraf's socket_listener (tcp://host:port)"""
+    
+    output_format = None  # Whatever --output selects
+    batch_bytes = 0  # Send every host's output as it is collected
+    ordered = False
+    
+    def __init__(self, url: str, timeout: float = 10):
+        match = re.match(r'^tcp://(\[[^\]]+\]|[^:/]+):(\d+)/?$', url)
+        if not match:
+            raise ValueError(f"Unsupported sink URL {url}, expected tcp://host:port")
+        self.address = (match.group(1).strip('[]'), int(match.group(2)))
+        self.timeout = timeout
+        self.sock = None
+    
+    def send(self, payload: bytes) -> None:
+        """Send one payload, connecting first if needed; raises OSError on failure"""
+        try:
+            if self.sock is None:
+                self.sock = socket.create_connection(self.address, timeout=self.timeout)
+            self.sock.sendall(payload)
+        except OSError:
+            self.close()
+            raise
+    
+    def close(self) -> None:
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+
+class HTTPSink:
+    """Batched HTTP push with a pooled keep-alive connection.
+    
+    Server errors, throttling and connection failures raise OSError so the
+    batch is spooled and retried; other 4xx responses mean the data itself
+    was rejected, so the batch is logged and dropped.
+    """
+    
+    content_type = "text/plain"
+    batch_bytes = 1024 * 1024
+    ordered = False
+    
+    def __init__(self, url: str, token: Optional[str] = None, timeout: float = 30, ssl_verify: bool = True):
+        self.url = url
+        self.timeout = timeout
+        self.ssl_verify = ssl_verify
+        self.logger = logging.getLogger(__name__)
+        self.session = requests.Session()
+        self.session.mount(url, requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.headers.update(self.headers(token))
+    
+    def headers(self, token: Optional[str]) -> Dict[str, str]:
+        return {"Content-Type": self.content_type}
+    
+    def encode(self, payload: bytes) -> bytes:
+        return payload
+    
+    def send(self, payload: bytes) -> None:
+        """POST one batch; raises OSError if it should be retried"""
+        response = self.session.post(self.url, data=self.encode(payload), timeout=self.timeout,
+                                     verify=self.ssl_verify)
+        if response.status_code == 429 or response.status_code >= 500:
+            raise OSError(f"HTTP {response.status_code} from {self.url}")
+        if response.status_code >= 400:
+            self.logger.error(f"{self.url} rejected a batch of {len(payload)} bytes: "
+                              f"HTTP {response.status_code} {response.text[:200]}")
+    
+    def close(self) -> None:
+        self.session.close()
+
+class InfluxWriteSink(HTTPSink):
+    """InfluxDB 2.x /api/v2/write with gzip-compressed line protocol"""
+    
+    output_format = "telegraf"
+    
+    def headers(self, token: Optional[str]) -> Dict[str, str]:
+        headers = {"Content-Type": "text/plain; charset=utf-8", "Content-Encoding": "gzip"}
+        if token:
+            headers["Authorization"] = f"Token {token}"
+        return headers
+    
+    def encode(self, payload: bytes) -> bytes:
+        return gzip.compress(payload, compresslevel=6)
+
+class RemoteWriteSink(HTTPSink):
+    """Prometheus remote_write 1.0 (snappy-compressed protobuf WriteRequest).
+    
+    Prometheus rejects samples older than the newest one it has for a series,
+    so while a backlog is spooled new output is queued behind it.
+    """
+    
+    output_format = "remote_write"
+    ordered = True
+    
+    def headers(self, token: Optional[str]) -> Dict[str, str]:
+        headers = {"Content-Type": "application/x-protobuf", "Content-Encoding": "snappy",
+                   "X-Prometheus-Remote-Write-Version": "0.1.0"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        return headers
+    
+    def encode(self, payload: bytes) -> bytes:
+        return snappy_compress(payload)
+
+SINK_TYPES = {"socket": SocketSink, "influx": InfluxWriteSink, "remote_write": RemoteWriteSink}
+
+class OutputSpool:
+    """Bounded append-only on-disk queue of output payloads.
+    
+    Payloads are appended to numbered segment files as length and CRC framed
+    records. Writes are fsynced at most every fsync_interval seconds, full
+    segments are rotated, and the oldest segments are dropped once the spool
+    exceeds max_bytes or max_age. A cursor file records how far replay got,
+    so a restart neither loses nor repeats delivered records.
+    """
+    
+    HEADER = struct.Struct(">II")  # payload length, crc32
+    
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024, max_age: float = 86400,
+                 segment_bytes: int = 8 * 1024 * 1024, fsync_interval: float = 1.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.logger = logging.getLogger(__name__)
+        self.cursor_file = os.path.join(directory, "cursor.json")
+        self.active = None
+        self.active_name = None
+        self.last_fsync = time.monotonic()
+        
+        os.makedirs(directory, exist_ok=True)
+        self.segments = {
+            os.path.basename(path): os.path.getsize(path)
+            for path in sorted(glob.glob(os.path.join(directory, "segment-*.log")))
+        }
+        self.cursor = {"segment": None, "offset": 0}
+        try:
+            with open(self.cursor_file, 'r') as f:
+                self.cursor = json.load(f)
+        except (OSError, ValueError):
+            pass
+    
+    def pending(self) -> bool:
+        """True if any records are waiting for replay"""
+        return any(size for name, size in self.segments.items()
+                   if not (name == self.cursor["segment"] and self.cursor["offset"] >= size))
+    
+    def append(self, payload: bytes) -> None:
+        """Append one payload, rotating and evicting segments as needed"""
+        if self.active is None or self.segments[self.active_name] >= self.segment_bytes:
+            self._rotate()
+        record = self.HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        self.active.write(record)
+        self.segments[self.active_name] += len(record)
+        if time.monotonic() - self.last_fsync >= self.fsync_interval:
+            self.sync()
+        self._evict()
+    
+    def sync(self) -> None:
+        """Flush and fsync the active segment"""
+        if self.active:
+            self.active.flush()
+            os.fsync(self.active.fileno())
+        self.last_fsync = time.monotonic()
+    
+    def _rotate(self) -> None:
+        if self.active:
+            self.sync()
+            self.active.close()
+        last = max(self.segments, default="segment-000000000000.log")
+        self.active_name = f"segment-{int(last[8:20]) + 1:012d}.log"
+        self.active = open(os.path.join(self.directory, self.active_name), 'ab')
+        self.segments[self.active_name] = 0
+    
+    def _evict(self) -> None:
+        """Drop the oldest closed segments beyond the size or age limit"""
+        now = time.time()
+        for name in sorted(self.segments):
+            if name == self.active_name:
+                break
+            path = os.path.join(self.directory, name)
+            too_big = sum(self.segments.values()) > self.max_bytes
+            too_old = now - os.path.getmtime(path) > self.max_age
+            if not (too_big or too_old):
+                break
+            self.logger.warning(f"Spool limit reached, dropping {name} ({self.segments[name]} bytes)")
+            self._delete(name)
+    
+    def _delete(self, name: str) -> None:
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+        self.segments.pop(name, None)
+        if self.cursor["segment"] == name:
+            self.cursor = {"segment": None, "offset": 0}
+    
+    def read(self, max_records: int) -> List[Tuple[str, int, bytes]]:
+        """Return up to max_records undelivered (segment, end offset, payload) tuples in order"""
+        if self.active and self.segments[self.active_name]:
+            # Replay only reads closed segments
+            self._rotate()
+        records = []
+        for name in sorted(self.segments):
+            if len(records) >= max_records or name == self.active_name:
+                break
+            offset = self.cursor["offset"] if name == self.cursor["segment"] else 0
+            with open(os.path.join(self.directory, name), 'rb') as f:
+                f.seek(offset)
+                while len(records) < max_records:
+                    header = f.read(self.HEADER.size)
+                    if len(header) < self.HEADER.size:
+                        break
+                    length, crc = self.HEADER.unpack(header)
+                    payload = f.read(length)
+                    if len(payload) < length or zlib.crc32(payload) != crc:
+                        self.logger.warning(f"Truncated or corrupt record in spool {name}, skipping the rest")
+                        self.segments[name] = offset
+                        break
+                    offset = f.tell()
+                    records.append((name, offset, payload))
+            if not records or records[-1][0] != name:
+                # Nothing (more) to deliver from this segment
+                self._delete(name)
+        return records
+    
+    def commit(self, name: str, offset: int) -> None:
+        """Mark everything up to offset in a segment as delivered"""
+        for older in sorted(self.segments):
+            if older >= name:
+                break
+            self._delete(older)
+        if offset >= self.segments.get(name, 0):
+            self._delete(name)
+            self.cursor = {"segment": None, "offset": 0}
+        else:
+            self.cursor = {"segment": name, "offset": offset}
+        tmp_path = f"{self.cursor_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.cursor, f)
+        os.replace(tmp_path, self.cursor_file)
+    
+    def close(self) -> None:
+        if self.active:
+            self.sync()
+            self.active.close()
+            self.active = None
+
+class SinkWriter:
+    """Deliver output to a network sink, spooling to disk while it is unavailable.
+    
+    Output is batched up to the sink's batch_bytes or batch_interval seconds.
+    Sending is synchronous, so a slow sink slows collection instead of
+    growing memory. New output is normally sent first and spooled batches
+    are replayed in the idle time between cycles at no more than replay_rate
+    batches per second, so a recovering sink is not flooded; sinks that need
+    samples in time order queue new output behind the backlog instead.
+    """
+    
+    def __init__(self, sink: Any, spool: OutputSpool, replay_rate: float = 200, retry_interval: float = 5,
+                 batch_interval: float = 5):
+        self.sink = sink
+        self.spool = spool
+        self.replay_rate = replay_rate
+        self.retry_interval = retry_interval
+        self.batch_interval = batch_interval
+        self.retry_at = 0
+        self.batch = []
+        self.batch_size = 0
+        self.batch_started = 0
+        self.logger = logging.getLogger(__name__)
+    
+    def available(self) -> bool:
+        return time.monotonic() >= self.retry_at
+    
+    def _send(self, payload: bytes) -> bool:
+        try:
+            self.sink.send(payload)
+            return True
+        except OSError as e:
+            if self.available():
+                self.logger.warning(f"Output sink unavailable, spooling: {e}")
+            self.retry_at = time.monotonic() + self.retry_interval
+            return False
+    
+    def write(self, output: Any) -> None:
+        """Queue one host's output (text, or bytes from a binary encoder) for delivery"""
+        payload = output if isinstance(output, bytes) else (output + "\n").encode()
+        if not self.sink.batch_bytes:
+            self._deliver(payload)
+            return
+        if not self.batch:
+            self.batch_started = time.monotonic()
+        self.batch.append(payload)
+        self.batch_size += len(payload)
+        if self.batch_size >= self.sink.batch_bytes or time.monotonic() - self.batch_started >= self.batch_interval:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Deliver the pending batch"""
+        if self.batch:
+            payload = b"".join(self.batch)
+            self.batch = []
+            self.batch_size = 0
+            self._deliver(payload)
+    
+    def _deliver(self, payload: bytes) -> None:
+        if self.sink.ordered and self.spool.pending():
+            self.spool.append(payload)
+        elif not (self.available() and self._send(payload)):
+            self.spool.append(payload)
+    
+    def replay(self, max_records: int) -> int:
+        """Replay up to max_records spooled records; returns the number delivered"""
+        delivered = 0
+        while delivered < max_records and self.available() and self.spool.pending():
+            records = self.spool.read(min(100, max_records - delivered))
+            if not records:
+                break
+            sent = 0
+            for name, offset, payload in records:
+                if not self._send(payload):
+                    break
+                sent += 1
+            if sent:
+                self.spool.commit(records[sent - 1][0], records[sent - 1][1])
+            delivered += sent
+            if sent < len(records):
+                break
+        return delivered
+    
+    def wait(self, seconds: float) -> None:
+        """Sleep until the deadline, replaying the spool at the throttled rate meanwhile"""
+        self.flush()
+        deadline = time.monotonic() + seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if not (self.available() and self.spool.pending()):
+                time.sleep(min(remaining, 1.0))
+                continue
+            slice_start = time.monotonic()
+            self.replay(max(1, int(self.replay_rate * 0.1)))
+            time.sleep(max(0, min(deadline, slice_start + 0.1) - time.monotonic()))
+    
+    def close(self) -> None:
+        self.flush()
+        self.spool.close()
+        self.sink.close()
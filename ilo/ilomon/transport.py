@@ -0,0 +1,52 @@
+"""
+HTTP session to a remote iLO's REST API
+
+requests and urllib3 make up most of the package's import time and local
+mode never talks HTTP, so this module is only imported for remote hosts.
+"""
+
+import json
+from typing import Dict, Optional
+
+import requests
+import urllib3
+from requests.auth import HTTPBasicAuth
+
+from .config import iLOConfig
+from .logs import get_logger
+from .jsonio import json_loads
+
+# Disable SSL warnings for self-signed certificates
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+class RedfishSession:
+    """Keep-alive session to one iLO or other Redfish BMC"""
+    
+    def __init__(self, config: iLOConfig):
+        self.config = config
+        self.session = requests.Session()
+        self.session.auth = HTTPBasicAuth(config.username, config.password)
+        self.session.verify = config.ssl_verify
+        self.session.timeout = config.timeout
+        self.base_url = f"https://{config.hostname}:{config.port}"
+        self.last_status = None  # HTTP status of the last request, None if it got no response
+    
+    def get(self, uri: str) -> Optional[Dict]:
+        """GET a resource by its path (e.g. /redfish/v1/Systems/1/) and decode it; None on any failure"""
+        url = f"{self.base_url}{uri}"
+        self.last_status = None
+        try:
+            # Pass verify explicitly: REQUESTS_CA_BUNDLE would otherwise override session.verify
+            response = self.session.get(url, timeout=self.config.timeout, verify=self.config.ssl_verify)
+            self.last_status = response.status_code
+            response.raise_for_status()
+            return json_loads(response.content)
+        except requests.exceptions.RequestException as e:
+            get_logger(__name__).error(f"Request failed for {url}: {e}")
+            return None
+        except json.JSONDecodeError as e:
+            get_logger(__name__).error(f"JSON decode error for {url}: {e}")
+            return None
+    
+    def close(self) -> None:
+        self.session.close()
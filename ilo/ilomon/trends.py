@@ -0,0 +1,195 @@
+"""
+Early-warning trends across every sensor of the collected hosts
+
+Static alert thresholds (``ilo_temperature_value > 85``) only fire once the
+damage window has started, and cannot express a fan losing RPM over days.
+With ``--trends`` the daemon keeps the last readings of every temperature,
+fan and power series in one NumPy matrix (a row per sensor, a column per
+cycle) and once per cycle computes, for all sensors at once, the slope over
+the window, an EWMA baseline and the z-score of the new reading against
+it. The results are added to the series as fields.
+"""
+
+import time
+from typing import Dict, List, Optional, Any, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Series prefix -> trended fields, their reading resolution (a floor for the
+# standard deviation, so steady integer sensors don't flag a one-step change)
+# and their early-warning rules:
+#   rise_per_hour: the slope over the window exceeds this
+#   drop_ratio: the reading is this far below its baseline
+#   zscore: the reading is this many standard deviations from its baseline
+TREND_RULES = {
+    "temperature_": {"fields": ("value",), "resolution": 1.0,
+                     "rise_per_hour": 12.0, "zscore": 4.0},  # 12 °C/h = 2 °C per 10 min
+    "fan_": {"fields": ("speed_rpm", "speed_percent"), "resolution": 1.0, "drop_ratio": 0.15, "zscore": 4.0},
+    "power_consumption": {"fields": ("current_watts",), "resolution": 5.0}
+}
+TREND_MIN_POINTS = 3
+
+class TrendDetector:
+    """Rolling slope, EWMA baseline and z-score of every sensor, updated in one vectorized pass per cycle.
+    
+    ``window`` is the number of cycles the slope is fitted over. The baseline
+    and its variance forget with a half-life of ``baseline_halflife``
+    seconds, so slow drifts show up as distance from the baseline. Fields
+    are added once a sensor has ``window / 3`` readings (at least 3).
+    Rows of removed hosts are reused.
+    """
+    
+    def __init__(self, window: int, baseline_halflife: float = 86400):
+        if np is None:
+            raise ImportError("Trend detection requires NumPy (pip3 install numpy)")
+        self.window = max(TREND_MIN_POINTS, window)
+        self.halflife = baseline_halflife
+        self.min_points = max(TREND_MIN_POINTS, self.window // 3)
+        self.rows = {}  # (host, series, field) -> row
+        self.host_rows = {}  # host -> [(host, series, field), ...]
+        self.free_rows = []
+        self.row_count = 0
+        self.cycle = 0
+        self.times = np.full(self.window, np.nan)
+        self._rules = {}
+        
+        self.values = np.full((0, self.window), np.nan, dtype=np.float32)
+        self.baseline = np.empty(0)
+        self.variance = np.empty(0)
+        self.weight = np.empty(0)  # Bias correction of the variance, 1 - product of (1 - alpha)
+        self.last_time = np.empty(0)
+        self.seen = np.empty(0, dtype=np.int64)
+        self.resolution = np.empty(0, dtype=np.float32)
+        self.rise_limit = np.empty(0, dtype=np.float32)
+        self.drop_ratio = np.empty(0, dtype=np.float32)
+        self.zscore_limit = np.empty(0, dtype=np.float32)
+        self._grow(1024)
+    
+    def _grow(self, size: int) -> None:
+        """Extend the per-row arrays to ``size`` rows"""
+        def extended(array, fill):
+            grown = np.full((size,) + array.shape[1:], fill, dtype=array.dtype)
+            grown[:len(array)] = array
+            return grown
+        
+        self.values = extended(self.values, np.nan)
+        self.baseline = extended(self.baseline, np.nan)
+        self.variance = extended(self.variance, 0.0)
+        self.weight = extended(self.weight, 0.0)
+        self.last_time = extended(self.last_time, np.nan)
+        self.seen = extended(self.seen, 0)
+        self.resolution = extended(self.resolution, 1.0)
+        self.rise_limit = extended(self.rise_limit, np.nan)
+        self.drop_ratio = extended(self.drop_ratio, np.nan)
+        self.zscore_limit = extended(self.zscore_limit, np.nan)
+    
+    def _rule(self, key: str) -> Optional[Dict[str, Any]]:
+        if key not in self._rules:
+            self._rules[key] = next((rule for prefix, rule in TREND_RULES.items() if key.startswith(prefix)), None)
+        return self._rules[key]
+    
+    def _add_row(self, host: str, key: str, field: str, rule: Dict[str, Any]) -> int:
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            if self.row_count == len(self.baseline):
+                self._grow(2 * self.row_count)
+            row = self.row_count
+            self.row_count += 1
+        self.resolution[row] = rule.get("resolution", 1.0)
+        self.rise_limit[row] = rule.get("rise_per_hour", np.nan)
+        self.drop_ratio[row] = rule.get("drop_ratio", np.nan)
+        self.zscore_limit[row] = rule.get("zscore", np.nan)
+        self.rows[(host, key, field)] = row
+        self.host_rows.setdefault(host, []).append((host, key, field))
+        return row
+    
+    def remove_host(self, host: str) -> None:
+        """Forget a host's sensors and free their rows"""
+        for name in self.host_rows.pop(host, []):
+            row = self.rows.pop(name)
+            self.values[row] = np.nan
+            self.baseline[row] = self.last_time[row] = np.nan
+            self.variance[row] = self.weight[row] = self.seen[row] = 0
+            self.free_rows.append(row)
+    
+    def update(self, collected: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Record one cycle of (host, metrics) results and add the trend fields to their series"""
+        now = time.time()
+        column = self.cycle % self.window
+        self.cycle += 1
+        self.times[column] = now
+        self.values[:, column] = np.nan
+        
+        entries = []
+        rows = []
+        readings = []
+        for host, metrics in collected:
+            for key, series in metrics.items():
+                rule = self._rule(key)
+                if rule is None or not isinstance(series, dict):
+                    continue
+                for field in rule["fields"]:
+                    reading = series.get(field)
+                    if isinstance(reading, bool) or not isinstance(reading, (int, float)):
+                        continue
+                    row = self.rows.get((host, key, field))
+                    if row is None:
+                        row = self._add_row(host, key, field, rule)
+                    entries.append((series, field))
+                    rows.append(row)
+                    readings.append(reading)
+        if not rows:
+            return
+        
+        rows = np.array(rows, dtype=np.intp)
+        readings = np.array(readings, dtype=np.float64)
+        self.values[rows, column] = readings
+        
+        # Least-squares slope over the window per row, skipping missing readings
+        history = self.values[rows].astype(np.float64)
+        valid = ~np.isnan(history)
+        points = valid.sum(axis=1)
+        elapsed = np.where(valid, self.times - now, 0.0)
+        history = np.where(valid, history, 0.0)
+        counts = np.maximum(points, 1)
+        centred = np.where(valid, elapsed - (elapsed.sum(axis=1) / counts)[:, None], 0.0)
+        spread = (centred * centred).sum(axis=1)
+        covariance = (centred * (history - (history.sum(axis=1) / counts)[:, None])).sum(axis=1)
+        slope = np.divide(covariance, spread, out=np.zeros_like(spread), where=spread > 0) * 3600
+        
+        # z-score against the baseline before this reading, then fold the reading in
+        baseline = self.baseline[rows]
+        variance = self.variance[rows]
+        weight = self.weight[rows]
+        first = np.isnan(baseline)
+        alpha = np.where(first, 1.0, -np.expm1(-np.log(2) * (now - self.last_time[rows]) / self.halflife))
+        deviation = np.where(first, 0.0, readings - baseline)
+        std = np.sqrt(np.divide(variance, weight, out=np.zeros_like(variance), where=weight > 0))
+        zscore = deviation / np.maximum(std, self.resolution[rows])
+        
+        warning = (slope > self.rise_limit[rows]) \
+            | (readings < baseline * (1 - self.drop_ratio[rows])) \
+            | (np.abs(zscore) >= self.zscore_limit[rows])
+        
+        self.baseline[rows] = np.where(first, readings, baseline + alpha * deviation)
+        self.variance[rows] = np.where(first, 0.0, (1 - alpha) * (variance + alpha * deviation * deviation))
+        self.weight[rows] = np.where(first, 0.0, 1 - (1 - alpha) * (1 - weight))
+        self.last_time[rows] = now
+        self.seen[rows] += 1
+        
+        ready = ((self.seen[rows] >= self.min_points) & (points >= self.min_points)).tolist()
+        slope = slope.round(3).tolist()
+        baseline = self.baseline[rows].round(2).tolist()
+        zscore = zscore.round(2).tolist()
+        warning = warning.tolist()
+        for i, (series, field) in enumerate(entries):
+            if not ready[i]:
+                continue
+            series[f"{field}_slope_per_hour"] = slope[i]
+            series[f"{field}_baseline"] = baseline[i]
+            series[f"{field}_zscore"] = zscore[i]
+            series["trend_warning"] = max(series.get("trend_warning", 0), int(warning[i]))
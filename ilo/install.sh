@@ -94,9 +94,15 @@ create_directories() {
 install_files() {
     print_status "Installing files..."
     
-    # Install main script
+    # Install main script and the ilomon package it runs from
     cp "$SCRIPT_DIR/ilo_monitor.py" "$INSTALL_DIR/"
     chmod +x "$INSTALL_DIR/ilo_monitor.py"
+    rm -rf "$INSTALL_DIR/ilomon"
+    cp -r "$SCRIPT_DIR/ilomon" "$INSTALL_DIR/"
+    rm -rf "$INSTALL_DIR/ilomon/__pycache__"
+    
+    # Compile now: the telegraf user cannot write __pycache__ and would recompile on every run
+    python3 -m compileall -q "$INSTALL_DIR/ilomon"
     
     # Install configuration file
     if [[ ! -f "$CONFIG_DIR/ilo_config.json" ]]; then
@@ -43,6 +43,37 @@ if ! python3 -c "import requests, json, subprocess, glob, re" 2>/dev/null; then
 fi
 print_success "Python dependencies OK"
 
+# Check that local mode stays cheap to start (it runs every interval on every host)
+print_test "Checking local mode startup budget..."
+STARTUP_BUDGET_MS="${ILO_STARTUP_BUDGET_MS:-75}"
+python3 "$MONITOR_SCRIPT" --local --output telegraf > /dev/null 2>&1  # Warm the bytecode cache
+startup_report=$(python3 -X importtime "$MONITOR_SCRIPT" --local --output telegraf 2>&1 > /dev/null | python3 -c "
+import re, sys
+total_us = 0
+loaded = set()
+started = False
+for line in sys.stdin:
+    match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)', line)
+    if not match:
+        continue
+    loaded.add(match.group(3))
+    # Top-level imports after interpreter startup are the monitor's own
+    if started and len(match.group(2)) == 1:
+        total_us += int(match.group(1))
+    started = started or match.group(3) == 'site'
+unwanted = sorted(loaded & {'requests', 'urllib3', 'argparse', 'multiprocessing', 'orjson', 'concurrent.futures'})
+print(total_us // 1000, ','.join(unwanted) or '-')
+")
+read -r startup_ms unwanted_modules <<< "$startup_report"
+if [[ "$unwanted_modules" != "-" ]]; then
+    print_fail "Local mode imported modules it does not use: $unwanted_modules"
+    exit 1
+elif [[ "$startup_ms" -gt "$STARTUP_BUDGET_MS" ]]; then
+    print_fail "Local mode imports took ${startup_ms}ms (budget ${STARTUP_BUDGET_MS}ms, override with ILO_STARTUP_BUDGET_MS)"
+    exit 1
+fi
+print_success "Local mode imports took ${startup_ms}ms (budget ${STARTUP_BUDGET_MS}ms)"
+
 # Check available tools
 print_test "Checking available monitoring tools..."
 
@@ -173,6 +204,73 @@ else
     echo "  Local config file not found: $local_config"
 fi
 
+# Test the sample history ring (daemon mode)
+print_test "Testing sample history ring..."
+history_dir=$(mktemp -d)
+history_config="$history_dir/ilo_config.json"
+cat > "$history_config" << EOF
+{"ilo_hosts": [{"hostname": "localhost", "local_mode": true, "cache_dir": "$history_dir"}]}
+EOF
+timeout 3 python3 "$MONITOR_SCRIPT" --config "$history_config" --daemon --interval 1 \
+    --sample-interval 0.2 --history-seconds 60 > /dev/null 2>&1
+history_rows=$(python3 "$MONITOR_SCRIPT" --config "$history_config" --dump-history localhost 2>/dev/null | tail -n +2 | wc -l)
+if [[ $history_rows -gt 0 ]]; then
+    print_success "History ring recorded $history_rows samples"
+else
+    print_fail "History ring is empty"
+fi
+rm -rf "$history_dir"
+
+# Test that a zero-padded --shard index selects the same hosts as the plain one
+print_test "Testing --shard with a zero-padded index..."
+shard_report=$(cd "$SCRIPT_DIR" && python3 -c "
+from argparse import Namespace
+from ilomon.config import iLOConfig
+from ilomon.runner import shard_configs
+configs = [iLOConfig(hostname=f'ilo-{i}', username='', password='', version='5') for i in range(30)]
+def hosts(shard):
+    return sorted(c.hostname for c in shard_configs(configs, Namespace(shard=shard, shard_members=None)))
+print(len(hosts('2/3')), int(hosts('2/3') == hosts('02/3')))
+" 2>&1)
+if [[ "$shard_report" =~ ^[1-9][0-9]*\ 1$ ]]; then
+    print_success "--shard 02/3 selected the same ${shard_report% *} hosts as --shard 2/3"
+else
+    print_fail "--shard 02/3 and --shard 2/3 selected different hosts: $shard_report"
+fi
+
+# Test that a drive smartctl can no longer read is not reported healthy from its cached attributes
+print_test "Testing SMART device that stops responding..."
+smart_dir=$(mktemp -d)
+mkdir "$smart_dir/bin"
+cat > "$smart_dir/bin/smartctl" << 'EOF'
+#!/bin/bash
+if [[ "$1" == "--scan" ]]; then
+    echo '{"devices": [{"name": "/dev/sdz", "type": "sat"}]}'
+elif [[ -f "$(dirname "$0")/fail" ]]; then
+    exit 2
+else
+    echo '{"smart_status": {"passed": true}, "temperature": {"current": 31}, "model_name": "Fake Disk"}'
+fi
+EOF
+chmod +x "$smart_dir/bin/smartctl"
+cat > "$smart_dir/ilo_config.json" << EOF
+{"ilo_hosts": [{"hostname": "localhost", "local_mode": true, "cache_dir": "$smart_dir",
+                "smart_attribute_interval": 0}]}
+EOF
+smart_status() {
+    PATH="$smart_dir/bin:$PATH" python3 "$MONITOR_SCRIPT" --config "$smart_dir/ilo_config.json" --output json 2>/dev/null \
+        | python3 -c "import json, sys; print(json.load(sys.stdin).get('drive_smart_sdz', {}).get('status'))"
+}
+healthy_status=$(smart_status)
+touch "$smart_dir/bin/fail"
+failed_status=$(smart_status)
+if [[ "$healthy_status" == "OK" && "$failed_status" == "Critical" ]]; then
+    print_success "Unreadable SMART device reported Critical after a successful scan"
+else
+    print_fail "SMART device status was $healthy_status, then $failed_status after it stopped responding"
+fi
+rm -rf "$smart_dir"
+
 # Summary
 echo ""
 echo "Test Summary:"
@@ -0,0 +1,140 @@
+#!/bin/bash
+
+# Test script for the native output sinks (Prometheus remote_write, InfluxDB /api/v2/write)
+# Runs the monitor in local mode against benchmarks/sink_receiver.py, including an outage
+# that must be spooled to disk and replayed once the receiver is back
+
+echo "iLO Monitor Output Sink Test"
+echo "============================"
+echo ""
+
+# Script directory
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+MONITOR_SCRIPT="$SCRIPT_DIR/ilo_monitor.py"
+RECEIVER_SCRIPT="$SCRIPT_DIR/benchmarks/sink_receiver.py"
+PORT="${SINK_TEST_PORT:-19090}"
+WORK_DIR="$(mktemp -d)"
+RECEIVER_PID=""
+
+# Colors for output
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+RED='\033[0;31m'
+BLUE='\033[0;34m'
+NC='\033[0m'
+
+print_test() {
+    echo -e "${YELLOW}[TEST]${NC} $1"
+}
+
+print_success() {
+    echo -e "${GREEN}[PASS]${NC} $1"
+}
+
+print_fail() {
+    echo -e "${RED}[FAIL]${NC} $1"
+    failures=$((failures + 1))
+}
+
+print_info() {
+    echo -e "${BLUE}[INFO]${NC} $1"
+}
+
+start_receiver() {
+    python3 "$RECEIVER_SCRIPT" --port "$PORT" "$@" > /dev/null &
+    RECEIVER_PID=$!
+    for _ in $(seq 1 50); do
+        curl -s "http://127.0.0.1:$PORT/stats" > /dev/null 2>&1 && return 0
+        sleep 0.1
+    done
+    return 1
+}
+
+stop_receiver() {
+    if [[ -n "$RECEIVER_PID" ]]; then
+        kill "$RECEIVER_PID" 2>/dev/null
+        wait "$RECEIVER_PID" 2>/dev/null
+        RECEIVER_PID=""
+    fi
+}
+
+stat_value() {
+    curl -s "http://127.0.0.1:$PORT/stats" | python3 -c "import json, sys; print(json.load(sys.stdin)['$1'])"
+}
+
+run_monitor() {
+    python3 "$MONITOR_SCRIPT" --local --spool-dir "$WORK_DIR/spool-$1" --sink "$2" --sink-type "$1" 2>/dev/null
+}
+
+cleanup() {
+    stop_receiver
+    rm -rf "$WORK_DIR"
+}
+trap cleanup EXIT
+
+failures=0
+
+# Test 1: Prometheus remote_write
+print_test "Testing Prometheus remote_write sink..."
+start_receiver || { print_fail "Receiver did not start on port $PORT"; exit 1; }
+run_monitor remote_write "http://127.0.0.1:$PORT/api/v1/write"
+series=$(stat_value remote_write_series)
+bad=$(stat_value bad_requests)
+if [[ "$series" -gt 0 && "$bad" -eq 0 ]]; then
+    print_success "remote_write delivered $series series (snappy protobuf decoded, labels sorted)"
+else
+    print_fail "remote_write delivered $series series, $bad bad requests"
+fi
+
+# Test 2: InfluxDB /api/v2/write
+print_test "Testing InfluxDB /api/v2/write sink..."
+run_monitor influx "http://127.0.0.1:$PORT/api/v2/write?org=ops&bucket=ilo"
+lines=$(stat_value influx_lines)
+if [[ "$lines" -gt 0 ]]; then
+    print_success "Influx write delivered $lines gzip line protocol lines"
+else
+    print_fail "Influx write delivered no lines"
+fi
+stop_receiver
+
+# Test 3: outage is spooled and replayed
+print_test "Testing spool and replay across a sink outage..."
+run_monitor influx "http://127.0.0.1:$PORT/api/v2/write?org=ops&bucket=ilo"
+segments=$(find "$WORK_DIR/spool-influx" -name 'segment-*.log' -size +0 | wc -l | tr -d ' ')
+if [[ "$segments" -gt 0 ]]; then
+    print_success "Output spooled to disk while the receiver was down"
+else
+    print_fail "Nothing spooled while the receiver was down"
+fi
+
+sleep 1  # Make sure the next run has a different timestamp
+start_receiver || { print_fail "Receiver did not restart"; exit 1; }
+run_monitor influx "http://127.0.0.1:$PORT/api/v2/write?org=ops&bucket=ilo"
+timestamps=$(curl -s "http://127.0.0.1:$PORT/stats" | python3 -c "import json, sys; print(len(json.load(sys.stdin)['influx_timestamps']))")
+if [[ "$timestamps" -ge 2 ]]; then
+    print_success "Spooled output replayed after recovery ($timestamps collection timestamps received)"
+else
+    print_fail "Spooled output was not replayed ($timestamps collection timestamps received)"
+fi
+stop_receiver
+
+# Test 4: server errors are retried, not dropped
+print_test "Testing retry on HTTP 503..."
+start_receiver --status 503 || { print_fail "Receiver did not start"; exit 1; }
+run_monitor remote_write "http://127.0.0.1:$PORT/api/v1/write"
+refused=$(stat_value refused)
+segments=$(find "$WORK_DIR/spool-remote_write" -name 'segment-*.log' -size +0 | wc -l | tr -d ' ')
+if [[ "$refused" -gt 0 && "$segments" -gt 0 ]]; then
+    print_success "HTTP 503 batch kept in the spool for retry"
+else
+    print_fail "HTTP 503 batch was not spooled (refused=$refused, segments=$segments)"
+fi
+stop_receiver
+
+echo ""
+if [[ $failures -eq 0 ]]; then
+    print_info "All output sink tests passed"
+else
+    print_info "$failures output sink test(s) failed"
+    exit 1
+fi